@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Batch
+
+A non-interactive engine for solving recorded module instances in bulk.
+Reads a stream of JSON records, one per line, of the form
+
+    {"id": 1, "bomb": {"serial": "AB1CD2", "batteries": 2},
+     "module": "simple_wires", "inputs": "RBYW"}
+
+and writes one JSON answer per line, either
+
+    {"id": 1, "module": "simple_wires", "answer": "LAST"}
+
+or, if the record couldn't be solved,
+
+    {"id": 1, "module": "simple_wires", "error": "..."}
+
+The "id" field is optional, and is passed straight through. See
+ktane.Bomb.from_dict for the format of the "bomb" field. Any bomb
+information a module needs but the record doesn't supply is an error,
+rather than a prompt. Records are processed one at a time, so memory use
+doesn't grow with the length of the stream.
+"""
+
+import argparse
+import json
+import sys
+
+import button
+import complicated_wires
+import keypad
+import maze
+import memory
+import morse
+import needy_knob
+import password
+import simon
+import simple_wires
+import wire_sequence
+import wof
+from ktane import Bomb
+
+
+def _simple_wires(bomb, inputs):
+    """inputs: the wire colours, e.g. "RBYW"."""
+    wires = inputs.upper()
+    if not simple_wires.is_valid_simple_wires(wires):
+        raise ValueError(f"Invalid wire sequence: {inputs}")
+    return simple_wires.wire_to_cut(wires, bomb)
+
+
+def _button(bomb, inputs):
+    """inputs: {"colour": "BLUE", "word": "ABORT"}."""
+    colour = button.parse_colour(inputs["colour"].upper())
+    word = button.parse_word(inputs["word"].upper())
+    return button.button_action(colour, word, bomb).value
+
+
+def _keypad(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: a list of four symbol descriptions."""
+    symbols = set()
+    for string in inputs:
+        symbol = keypad.parse_symbol(string)
+        if symbol is None:
+            raise ValueError(f"Symbol not recognised: {string}")
+        symbols.add(symbol)
+    orders = keypad.keypad_orders(symbols)
+    if not orders:
+        raise ValueError("No column contains all of the symbols")
+    if len(orders) > 1:
+        return {"candidates": [list(order) for order in orders]}
+    return list(orders[0])
+
+
+def _simon(bomb, inputs):
+    """inputs: the flashed colours, e.g. "RBGY"."""
+    lights = inputs.upper()
+    if not simon.is_valid_simon(lights):
+        raise ValueError(f"Invalid colour sequence: {inputs}")
+    return simon.simon_sequence(lights, bomb.serial_vowel, bomb.strikes)
+
+
+def _wof(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: {"display": "YES", "buttons": [six labels in reading
+    order]}, or {"display": "YES", "button": "READY"}, where button is
+    the word on the button the display points to.
+    """
+    display = inputs["display"].upper().replace(" ", "")
+    if display not in wof.DISPLAY_DICT:
+        raise ValueError(f"Invalid display entry: {inputs['display']}")
+    if "buttons" in inputs:
+        labels = [label.upper().replace(" ", "") for label in inputs["buttons"]]
+        if len(labels) != 6 or not all(label in wof.PRIORITIES for label in labels):
+            raise ValueError(f"Invalid button entries: {inputs['buttons']}")
+        position = wof.button_to_press(display, labels)
+        return {"position": wof.POSITIONS[position], "label": inputs["buttons"][position]}
+    label = inputs["button"].upper().replace(" ", "")
+    if label not in wof.BUTTON_DICT:
+        raise ValueError(f"Invalid button entry: {inputs['button']}")
+    return {"read": wof.DISPLAY_DICT[display], "priorities": wof.BUTTON_DICT[label]}
+
+
+def _memory(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: a list of five stages, each of the form
+    {"display": 3, "labels": [2, 4, 1, 3]}.
+    """
+    stages = memory.solve_game([stage["display"] for stage in inputs],
+                               [stage["labels"] for stage in inputs])
+    return [stage._asdict() for stage in stages]
+
+
+def _morse(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: a list of Morse letters, e.g. ["...", "....", "."]."""
+    try:
+        letters = "".join(morse.Morse.MORSE_LETTERS[sequence] for sequence in inputs)
+    except KeyError as err:
+        raise ValueError(f"Invalid morse sequence: {err.args[0]}") from None
+    valid_words = morse.candidate_words(letters)
+    if len(valid_words) == 1:
+        word, = valid_words
+        return {"word": word, "frequency": morse.Morse.VALID_WORDS[word]}
+    return {"candidates": list(valid_words)}
+
+
+def _complicated_wires(bomb, inputs):
+    """inputs: a list of wires, e.g. ["RW", "BSL", ""]."""
+    wires = [complicated_wires.normalise_wire(wire) for wire in inputs]
+    for wire, raw in zip(wires, inputs):
+        if wire not in complicated_wires.CUT_RULES:
+            raise ValueError(f"Invalid wire: {raw}")
+    return [complicated_wires.should_cut(wire, bomb) for wire in wires]
+
+
+def _wire_sequence(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: every wire across all panels in order, e.g. ["RA", "KC"],
+    or a list of panels, e.g. [["RA", "KC"], ["BB"]].
+    """
+    state = wire_sequence.SequenceState()
+    if inputs and isinstance(inputs[0], list):
+        panels = [[wire.upper() for wire in panel] for panel in inputs]
+        flat = False
+    else:
+        panels = [[wire.upper()] for wire in inputs]
+        flat = True
+    for panel in panels:
+        for wire in panel:
+            if not wire_sequence.is_valid_wire_sequence(wire):
+                raise ValueError(f"Invalid wire: {wire}")
+    cuts = state.submit_panels(panels)
+    return [cut for panel in cuts for cut in panel] if flat else cuts
+
+
+def _maze(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: {"circle": [1, 5], "start": [1, 1], "end": [6, 6]}."""
+    try:
+        routes = maze.ROUTE_LOOKUP[tuple(inputs["circle"])]
+    except KeyError:
+        raise ValueError(f"Invalid circle coordinates: {inputs['circle']}") from None
+    try:
+        moves = routes[tuple(inputs["start"]), tuple(inputs["end"])]
+    except KeyError:
+        raise ValueError(f"Invalid coordinates: {inputs['start']}, {inputs['end']}") from None
+    return [maze.MOVE_LOOKUP[move] for move in moves]
+
+
+def _password(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: the letters on each dial, e.g. ["ABCDEF", "GHIJKL"]."""
+    return password.matching_passwords([dial.upper() for dial in inputs])
+
+
+def _needy_knob(bomb, inputs):  # pylint: disable=unused-argument
+    """inputs: the number of lit lights on the left and right, e.g. "44",
+    or all twelve lights, top row then bottom row, e.g. "001011111101".
+    The latter gives {"direction", "distance"}, where distance is the
+    number of lights that differ from the nearest layout.
+    """
+    if len(inputs) != 12:
+        return needy_knob.VALID_LIGHTS[needy_knob.normalise_lights(inputs)]
+    direction, distance = needy_knob.classify_lights(needy_knob.parse_light_mask(inputs))
+    if direction is None:
+        raise ValueError(f"Lights equally close to two directions: {inputs}")
+    return {"direction": direction, "distance": distance}
+
+
+HANDLERS = {"simple_wires": _simple_wires,
+            "button": _button,
+            "keypad": _keypad,
+            "simon": _simon,
+            "wof": _wof,
+            "memory": _memory,
+            "morse": _morse,
+            "complicated_wires": _complicated_wires,
+            "wire_sequence": _wire_sequence,
+            "maze": _maze,
+            "password": _password,
+            "needy_knob": _needy_knob}
+
+
+class BatchSolver:
+    """Solves records one at a time. Consecutive records for the same
+    bomb share a single Bomb object.
+    """
+    def __init__(self):
+        self._bomb_data = None
+        self._bomb = None
+
+    def bomb(self, data):
+        """Return a non-interactive Bomb for the given bomb dict."""
+        if data != self._bomb_data:
+            self._bomb = Bomb.from_dict(data)
+            self._bomb_data = data
+        return self._bomb
+
+    def solve(self, record):
+        """Solve a single record, returning the answer record."""
+        result = {}
+        if "id" in record:
+            result["id"] = record["id"]
+        module = result["module"] = record.get("module")
+        try:
+            handler = HANDLERS[module]
+        except (KeyError, TypeError):  # TypeError if the module isn't hashable
+            result["error"] = f"Unknown module: {module}"
+            return result
+        try:
+            result["answer"] = handler(self.bomb(record.get("bomb", {})), record["inputs"])
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as err:
+            result["error"] = f"{type(err).__name__}: {err}"
+        return result
+
+    def solve_stream(self, lines, out):
+        """Solve every JSON record in an iterable of lines, writing one
+        JSON answer per line to out. Blank lines are skipped.
+        """
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as err:
+                result = {"error": f"Invalid JSON: {err}"}
+            else:
+                if isinstance(record, dict):
+                    result = self.solve(record)
+                else:
+                    result = {"error": "Record must be a JSON object"}
+            out.write(json.dumps(result, separators=(",", ":")))
+            out.write("\n")
+
+
+def main(argv=None):
+    """Solve a JSONL stream from a file or stdin."""
+    parser = argparse.ArgumentParser(description="Solve a stream of KTANE module records.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="JSONL file of records to solve (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file to write answers to (default: stdout)")
+    args = parser.parse_args(argv)
+
+    # pylint: disable=consider-using-with
+    infile = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    outfile = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        BatchSolver().solve_stream(infile, outfile)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""Benchmarks
+
+Times the decision logic of the solvers against scripted inputs, without
+any of the interactive prompts, and the cold start of the REPL. Run with
+the names of the benchmarks to run, or no arguments to run all of them.
+
+Per-call timings can be saved as baselines with --save, and later runs
+compared against them with --compare, which fails if any benchmark got
+slower by more than --threshold percent.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import timeit
+
+import button
+import complicated_wires
+import keypad
+import maze
+import memory
+import morse
+import needy_knob
+import password
+import simon
+import simple_wires
+import wire_sequence
+import wof
+from ktane import SOLVERS, Bomb
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "benchmark_baselines.json")
+
+# Per-call times of every benchmark run so far, in microseconds
+RESULTS = {}
+
+
+def _time(func, repeat=5):
+    """Return the best time of several runs of func, in seconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def _report(name, seconds, count):
+    """Print the per-call latency and throughput of a benchmark, and
+    record it in RESULTS.
+    """
+    RESULTS[name] = seconds / count * 1e6
+    print(f"{name:<40} {seconds / count * 1e6:10.3f} us/call {count / seconds:14,.0f} calls/s")
+
+
+def bench_maze():
+    """Compare the DFS against the shortest-route table, over every
+    (circle, start, end) query.
+    """
+    queries = [(circle, start, end) for circle, grid in maze.MAZE_LOOKUP.items()
+               for start in grid for end in grid if start != end]
+
+    def dfs():
+        for circle, start, end in queries:
+            maze.DFS_maze(maze.MAZE_LOOKUP[circle], start, end)
+
+    def table():
+        for circle, start, end in queries:
+            maze.shortest_route(circle, start, end)
+
+    def bulk():
+        maze.shortest_routes(queries)
+
+    _report("maze: DFS", _time(dfs, repeat=1), len(queries))
+    _report("maze: route table", _time(table), len(queries))
+    _report("maze: route table (bulk)", _time(bulk), len(queries))
+
+
+def bench_keypad():
+    """Compare scanning the columns against the precomputed answer
+    table, over every set of four symbols from the same column.
+    """
+    keypads = [set(order) for col in keypad.COLUMNS
+               for order in itertools.combinations(col, 4)]
+
+    def scan():
+        # pylint: disable=expression-not-assigned
+        for symbols in keypads:
+            for col in keypad.COLUMNS:
+                if symbols.issubset(set(col)):
+                    [item for item in col if item in symbols]
+                    break
+
+    def table():
+        for symbols in keypads:
+            keypad.keypad_orders(symbols)
+
+    def bulk():
+        keypad.solve_keypads(keypads)
+
+    _report("keypad: column scan", _time(scan), len(keypads))
+    _report("keypad: answer table", _time(table), len(keypads))
+    _report("keypad: answer table (bulk)", _time(bulk), len(keypads))
+
+
+def bench_complicated_wires():
+    """Compare evaluating wires one at a time against a single pass over
+    encoded wires with a precomputed cut vector.
+    """
+    bomb = Bomb.from_dict({"serial": "AB1CD2", "batteries": 2,
+                           "ports": {"parallel_port": True}})
+    rng = random.Random(0)
+    wires = rng.choices(list(complicated_wires.CUT_RULES), k=100_000)
+    codes = complicated_wires.encode_wires(wires)
+
+    def per_wire():
+        for wire in wires:
+            complicated_wires.should_cut(wire, bomb)
+
+    def vectorised():
+        complicated_wires.evaluate_wires(codes, complicated_wires.cut_vector(bomb))
+
+    _report("complicated_wires: per wire", _time(per_wire), len(wires))
+    _report("complicated_wires: cut vector", _time(vectorised), len(wires))
+
+
+def bench_simple_wires():
+    """Compare running the rules against the compiled table, over random
+    wire sequences and serial numbers.
+    """
+    rng = random.Random(0)
+    pairs = [("".join(rng.choices("KBYRW", k=rng.randint(3, 6))),
+              f"AB1CD{rng.randrange(10)}") for _ in range(100_000)]
+    bombs = {serial: Bomb.from_dict({"serial": serial, "batteries": 0})
+             for serial in {serial for _, serial in pairs}}
+    simple_wires.cut_lookup()  # Load it outside the timings
+
+    def rules():
+        for wires, serial in pairs:
+            simple_wires.evaluate_rules(wires, bombs[serial])
+
+    def table():
+        for wires, serial in pairs:
+            simple_wires.wire_to_cut(wires, bombs[serial])
+
+    def bulk():
+        simple_wires.cut_indices(pairs)
+
+    _report("simple_wires: rules", _time(rules), len(pairs))
+    _report("simple_wires: table", _time(table), len(pairs))
+    _report("simple_wires: cut indices (bulk)", _time(bulk), len(pairs))
+
+
+def bench_button():
+    """Compare running the rules against the decision trees, and the
+    truth table in bulk, over random buttons and bombs.
+    """
+    rng = random.Random(0)
+    instances = [(rng.choice(list(button.Colour)), rng.choice(list(button.Word)),
+                  rng.randrange(5), rng.random() < 0.5, rng.random() < 0.5)
+                 for _ in range(100_000)]
+    bombs = {facts: Bomb.from_dict({"serial": "AB1CD2", "batteries": facts[0],
+                                    "indicators": {"CAR": facts[1], "FRK": facts[2]}})
+             for facts in itertools.product(range(5), (False, True), (False, True))}
+    cases = [(colour, word, bombs[batteries, car, frk])
+             for colour, word, batteries, car, frk in instances]
+
+    def rules():
+        for colour, word, bomb in cases:
+            button.evaluate_rules(colour, word, bomb)
+
+    def tree():
+        for colour, word, bomb in cases:
+            button.button_action(colour, word, bomb)
+
+    def bulk():
+        button.button_actions(instances)
+
+    _report("button: rules", _time(rules), len(cases))
+    _report("button: decision tree", _time(tree), len(cases))
+    _report("button: truth table (bulk)", _time(bulk), len(cases))
+
+
+def bench_memory():
+    """Compare solving recorded games stage by stage against the
+    compiled rules, checking they agree.
+    """
+    rng = random.Random(0)
+    games = [([rng.randint(1, 4) for _ in range(5)],
+              [rng.sample((1, 2, 3, 4), 4) for _ in range(5)]) for _ in range(20_000)]
+    if memory.check_games(games):
+        raise SystemExit("memory: solve_game disagrees with solve_stages")
+
+    def stages():
+        for displays, labels in games:
+            memory.solve_stages(displays, labels)
+
+    def bulk():
+        memory.solve_games(games)
+
+    _report("memory: stage by stage", _time(stages), len(games))
+    _report("memory: compiled rules (bulk)", _time(bulk), len(games))
+
+
+def bench_wof():
+    """Time finding the button to press, over every display and every
+    set of six labels from the same group, with the labels rotated so the
+    display points at each of them in turn.
+    """
+    groups = (wof.VALID_BUTTONS[:14], wof.VALID_BUTTONS[14:])
+    layouts = []
+    for labels in itertools.chain.from_iterable(itertools.combinations(group, 6)
+                                                for group in groups):
+        for display, position in wof.DISPLAY_POSITIONS.items():
+            layouts.append((display, labels[position:] + labels[:position]))
+
+    def resolve():
+        for display, labels in layouts:
+            wof.button_to_press(display, labels)
+
+    def bulk():
+        wof.buttons_to_press(layouts)
+
+    _report("wof: button to press", _time(resolve, repeat=3), len(layouts))
+    _report("wof: button to press (bulk)", _time(bulk, repeat=3), len(layouts))
+
+
+def _random_bomb(rng):
+    """Return a non-interactive bomb with random attributes."""
+    serial = "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXZ0123456789", k=5))
+    serial += rng.choice("0123456789")
+    indicators = {name: rng.choice((True, False, None))
+                  for name in Bomb.FEATURE_BITS if not name.endswith("_port")}
+    ports = {name: rng.random() < 0.5 for name in Bomb.FEATURE_BITS if name.endswith("_port")}
+    return Bomb.from_dict({"serial": serial, "batteries": rng.randrange(5),
+                           "indicators": indicators, "ports": ports})
+
+
+def _solver_cases(rng, bombs):
+    """Return a list of (function, arguments) workloads for the decision
+    core of each solver, keyed by solver name.
+    """
+    layouts = [(display, labels[position:] + labels[:position])
+               for labels in itertools.combinations(wof.VALID_BUTTONS[:14], 6)
+               for display, position in wof.DISPLAY_POSITIONS.items()]
+    keypads = [set(order) for col in keypad.COLUMNS
+               for order in itertools.combinations(col, 4)]
+    circles = [(circle, grid) for circle, grid in maze.MAZE_LOOKUP.items()]
+    words = list(morse.Morse.VALID_WORDS)
+    passwords = password.Password.VALID_PASSWORDS
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+    def dials(word):
+        # The word's letters, each hidden among five random ones
+        return ["".join(rng.sample(letters, 5)) + letter for letter in word]
+
+    def memory_game():
+        return ([rng.randint(1, 4) for _ in range(5)],
+                [rng.sample((1, 2, 3, 4), 4) for _ in range(5)])
+
+    def maze_query():
+        circle, grid = rng.choice(circles)
+        start, end = rng.sample(list(grid), 2)
+        return circle, start, end
+
+    return {
+        "simple_wires": (simple_wires.wire_to_cut,
+                         [("".join(rng.choices("RBYWK", k=rng.randint(3, 6))), rng.choice(bombs))
+                          for _ in range(10_000)]),
+        "button": (button.button_action,
+                   [(rng.choice(list(button.Colour)), rng.choice(list(button.Word)),
+                     rng.choice(bombs)) for _ in range(10_000)]),
+        "keypad": (keypad.keypad_orders, [(rng.choice(keypads),) for _ in range(10_000)]),
+        "simon": (simon.simon_sequence,
+                  [("".join(rng.choices("RBYG", k=rng.randint(1, 5))), rng.random() < 0.5,
+                    rng.randrange(3)) for _ in range(10_000)]),
+        "wof": (wof.button_to_press, [rng.choice(layouts) for _ in range(10_000)]),
+        "memory": (memory.solve_game, [memory_game() for _ in range(2_000)]),
+        "morse": (morse.candidate_words,
+                  [(rng.choice(words)[:rng.randint(2, 4)],) for _ in range(10_000)]),
+        "complicated_wires": (complicated_wires.should_cut,
+                              [(rng.choice(list(complicated_wires.CUT_RULES)), rng.choice(bombs))
+                               for _ in range(10_000)]),
+        "wire_sequence": (wire_sequence.should_cut,
+                          [(rng.choice("RBK"), rng.choice("ABC"), rng.randrange(9))
+                           for _ in range(10_000)]),
+        "maze": (maze.shortest_route, [maze_query() for _ in range(10_000)]),
+        "password": (password.matching_passwords,
+                     [(dials(rng.choice(passwords)),) for _ in range(2_000)]),
+        "needy_knob": (needy_knob.classify_lights,
+                       [(rng.randrange(1 << 12),) for _ in range(10_000)]),
+    }
+
+
+def bench_solvers():
+    """Time the decision core of every solver, over random bombs and
+    inputs, as it would be called once per solve.
+    """
+    rng = random.Random(0)
+    bombs = [_random_bomb(rng) for _ in range(100)]
+    for name, (func, cases) in _solver_cases(rng, bombs).items():
+        def run(func=func, cases=cases):
+            for args in cases:
+                func(*args)
+        _report(f"solver: {name}", _time(run, repeat=15), len(cases))
+
+
+# The most that importing ktane may take, in milliseconds. Generous
+# enough to absorb noise, but well under the time it took when every
+# solver was imported up front
+STARTUP_BUDGET_MS = 40
+
+
+def _import_times(module):
+    """Return the cumulative import time of each module imported by
+    importing the given module in a fresh interpreter, in microseconds.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def bench_startup():
+    """Time importing ktane in a fresh interpreter, and check that none
+    of the solvers are imported before they're needed. Exits with an
+    error if either check fails, so this can gate a release.
+    """
+    runs = [_import_times("ktane") for _ in range(5)]
+    best = min(times["ktane"] for times in runs) / 1000
+    print(f"{'startup: import ktane':<40} {best:10.3f} ms (budget {STARTUP_BUDGET_MS} ms)")
+
+    eager = sorted(set(SOLVERS).intersection(runs[0]))
+    if eager:
+        sys.exit(f"Solvers imported at startup: {', '.join(eager)}")
+    if best > STARTUP_BUDGET_MS:
+        sys.exit(f"Importing ktane took {best:.1f} ms, over the {STARTUP_BUDGET_MS} ms budget")
+
+
+BENCHMARKS = {"solvers": bench_solvers,
+              "simple_wires": bench_simple_wires,
+              "button": bench_button,
+              "memory": bench_memory,
+              "maze": bench_maze,
+              "keypad": bench_keypad,
+              "complicated_wires": bench_complicated_wires,
+              "wof": bench_wof,
+              "startup": bench_startup}
+
+
+def compare(baselines, threshold):
+    """Compare RESULTS against baseline per-call times, and return the
+    names of the benchmarks that got slower by more than threshold
+    percent.
+    """
+    regressions = []
+    for name, current in RESULTS.items():
+        if name not in baselines:
+            continue
+        change = (current / baselines[name] - 1) * 100
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {baselines[name]:10.3f} -> {current:10.3f} us/call "
+              f"{change:+7.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    """Run the requested benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark the KTANE solvers.")
+    parser.add_argument("names", nargs="*",
+                        help=f"benchmarks to run, from {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--baselines", default=BASELINES_PATH,
+                        help="file of baseline per-call times (default: %(default)s)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true",
+                      help="save the results as the new baselines")
+    mode.add_argument("--compare", action="store_true",
+                      help="compare the results against the baselines")
+    parser.add_argument("--threshold", type=float, default=25,
+                        help="percentage slowdown that counts as a regression "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+    if args.save:
+        baselines = {}
+        if os.path.exists(args.baselines):
+            with open(args.baselines, encoding="utf-8") as baselines_file:
+                baselines = json.load(baselines_file)
+        baselines.update({name: round(time, 3) for name, time in RESULTS.items()})
+        with open(args.baselines, "w", encoding="utf-8") as baselines_file:
+            json.dump(dict(sorted(baselines.items())), baselines_file, indent=4)
+            baselines_file.write("\n")
+    elif args.compare:
+        with open(args.baselines, encoding="utf-8") as baselines_file:
+            baselines = json.load(baselines_file)
+        print("")
+        regressions = compare(baselines, args.threshold)
+        if regressions:
+            sys.exit(f"{len(regressions)} benchmark(s) regressed by more than "
+                     f"{args.threshold:g}%: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
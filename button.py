@@ -5,7 +5,9 @@ with 4 possible different words on it. Based on these two criteria,
 the button should either be pressed, or held until a specific time.
 """
 
+import itertools
 from enum import Enum
+from types import SimpleNamespace
 
 from colours import bold, blue, yellow
 from utils import get_input
@@ -40,18 +42,36 @@ class Word(Enum):
     PRESS = "P"
 
 
+class Action(Enum):
+    """What to do with the button."""
+    PRESS = "PRESS"
+    HOLD = "HOLD"
+
+
+def parse_colour(string):
+    """Convert a colour name (or its initial) to a Colour, raising
+    ValueError if it isn't one.
+    """
+    # Black is represented by "K", not "B", so we have a special
+    # check for it
+    if string == "BLACK":
+        return Colour.BLACK
+    return Colour(string[:1])
+
+
+def parse_word(string):
+    """Convert a button word (or its initial) to a Word, raising
+    ValueError if it isn't one.
+    """
+    return Word(string[:1])
+
+
 def get_button_colour():
     """Get user input to get the colour of the button."""
     while True:
         button_colour = get_input("Input the button colour: ")
         try:
-            # Black is represented by "K", not "B", so we have a special
-            # check for it
-            if button_colour == "BLACK":
-                colour = Colour.BLACK
-            else:
-                colour = Colour(button_colour[0])
-            return colour
+            return parse_colour(button_colour)
         except ValueError:
             print("Supply a valid colour")
 
@@ -61,11 +81,127 @@ def get_button_word():
     while True:
         button_word = get_input("Input word on button: ")
         try:
-            return Word(button_word[0])
+            return parse_word(button_word)
         except ValueError:
             print("Supply a valid word")
 
 
+def evaluate_rules(colour, word, bomb):
+    """Return whether a button with the given colour and word should be
+    pressed and released, or held, by running through the rules in the
+    manual.
+    """
+    if colour == Colour.BLUE and word == Word.ABORT:
+        return Action.HOLD
+    if word == Word.DETONATE and bomb.battery_bucket > 1:
+        return Action.PRESS
+    if colour == Colour.WHITE and bomb.CAR.lit:
+        return Action.HOLD
+    if bomb.FRK.lit and bomb.battery_bucket > 2:
+        return Action.PRESS
+    if colour == Colour.YELLOW:
+        return Action.HOLD
+    if colour == Colour.RED and word == Word.HOLD:
+        return Action.PRESS
+    return Action.HOLD
+
+
+# The bomb facts the rules use, in the order they're asked for, with the
+# number of values each can take
+FACTS = (("batteries", 4), ("CAR", 2), ("FRK", 2))
+_FACT_GETTERS = {"batteries": lambda bomb: bomb.battery_bucket,
+                 "CAR": lambda bomb: int(bomb.CAR.lit),
+                 "FRK": lambda bomb: int(bomb.FRK.lit)}
+_COLOUR_INDEX = {colour: index for index, colour in enumerate(Colour)}
+_WORD_INDEX = {word: index for index, word in enumerate(Word)}
+
+
+def _truth_table():
+    table = []
+    for colour, word, batteries, car, frk in itertools.product(
+            Colour, Word, range(4), (False, True), (False, True)):
+        bomb = SimpleNamespace(battery_bucket=batteries, CAR=SimpleNamespace(lit=car),
+                               FRK=SimpleNamespace(lit=frk))
+        table.append(evaluate_rules(colour, word, bomb))
+    return tuple(table)
+
+
+def _decision_tree(actions):
+    """Turn a dict from (batteries, CAR, FRK) values to Actions into
+    either an Action, if they're all the same, or a (fact, subtrees)
+    pair, with a subtree for each value of the fact to ask for next.
+    The fact is chosen to minimise the total number of facts asked for
+    over every combination of values. Returns the tree and that total.
+    """
+    if len(set(actions.values())) == 1:
+        return next(iter(actions.values())), 0
+    best = None
+    for position, (fact, size) in enumerate(FACTS):
+        if len({values[position] for values in actions}) == 1:
+            continue  # Already asked for
+        subtrees, cost = [], len(actions)
+        for value in range(size):
+            subtree, subtree_cost = _decision_tree({values: action
+                                                    for values, action in actions.items()
+                                                    if values[position] == value})
+            subtrees.append(subtree)
+            cost += subtree_cost
+        if best is None or cost < best[1]:
+            best = (fact, tuple(subtrees)), cost
+    return best
+
+
+def _tree_facts(tree):
+    if isinstance(tree, Action):
+        return set()
+    fact, subtrees = tree
+    return {fact}.union(*(_tree_facts(subtree) for subtree in subtrees))
+
+
+def _table_index(colour, word, batteries, car, frk):
+    return (((_COLOUR_INDEX[colour] * 4 + _WORD_INDEX[word]) * 4 + min(batteries, 3)) * 4
+            + car * 2 + frk)
+
+
+def required_facts(colour, word):
+    """Return the names of the bomb facts (out of FACTS) that the action
+    for a colour and word can depend on. Any others aren't asked for.
+    """
+    return REQUIRED_FACTS[colour][word]
+
+
+def button_action(colour, word, bomb):
+    """Return whether a button with the given colour and word should be
+    pressed and released, or held. Bomb attributes are only looked up
+    if the answer still depends on them, given the ones looked up so far.
+    """
+    node = DECISION_TREES[colour][word]
+    while not isinstance(node, Action):
+        fact, subtrees = node
+        node = subtrees[_FACT_GETTERS[fact](bomb)]
+    return node
+
+
+def button_actions(instances):
+    """Return the action for each of an iterable of (colour, word,
+    batteries, CAR lit, FRK lit) button instances, e.g. from many bombs.
+    """
+    return [TRUTH_TABLE[_table_index(*instance)] for instance in instances]
+
+
+# The action for every colour, word, battery bucket (capped at 3), and
+# whether CAR and FRK are lit, in that order
+TRUTH_TABLE = _truth_table()
+DECISION_TREES = {colour: {word: _decision_tree({
+    (batteries, car, frk): TRUTH_TABLE[_table_index(colour, word, batteries, car, frk)]
+    for batteries, car, frk in itertools.product(range(4), (0, 1), (0, 1))})[0]
+                           for word in Word}
+                  for colour in Colour}
+REQUIRED_FACTS = {colour: {word: tuple(fact for fact, _ in FACTS if fact in _tree_facts(tree))
+                           for word, tree in trees.items()}
+                  for colour, trees in DECISION_TREES.items()}
+
+
 class Button:
     """Class to represent the button. Solving requires getting the
     colour and word, and then either pressing or holding depending
@@ -78,20 +214,10 @@ class Button:
 
     def solve(self):
         """Solve the button module on the bomb."""
-        if self.colour == Colour.BLUE and self.word == Word.ABORT:
+        if button_action(self.colour, self.word, self.bomb) == Action.HOLD:
             print(HOLD_STRING)
-        elif self.word == Word.DETONATE and self.bomb.batteries > 1:
-            print(RELEASE_STRING)
-        elif self.colour == Colour.WHITE and self.bomb.CAR.lit:
-            print(HOLD_STRING)
-        elif self.bomb.FRK.lit and self.bomb.batteries > 2:
-            print(RELEASE_STRING)
-        elif self.colour == Colour.YELLOW:
-            print(HOLD_STRING)
-        elif self.colour == Colour.RED and self.word == Word.HOLD:
-            print(RELEASE_STRING)
         else:
-            print(HOLD_STRING)
+            print(RELEASE_STRING)
 
 if __name__ == "__main__":
     print("Please run the script ktane.py instead!")
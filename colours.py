@@ -1,32 +1,86 @@
 """Colours
 
 Contains helper functions to add the relevant control codes to print
-text in different colours in a terminal.
+text in different colours in a terminal, and a buffer to collect the
+output of a module and write it out all at once.
+
+Colour is turned off when stdout isn't a terminal, e.g. when piped to a
+log, or when the NO_COLOR environment variable is set. This is decided
+once, when the module is first imported.
 """
 
+import os
+import sys
+
+COLOUR = sys.stdout.isatty() and not os.environ.get("NO_COLOR")
+
+# Coloured fragments are cached, as the solvers colour the same handful
+# of words over and over. The cache stops growing past this size.
+MAX_FRAGMENTS = 1024
+_FRAGMENTS = {}
+
+
+def _style(code, string):
+    """Return string wrapped in the given control code, or as it is if
+    colour is off.
+    """
+    try:
+        return _FRAGMENTS[code, string]
+    except KeyError:
+        fragment = f"\033[{code}m{string}\033[0m" if COLOUR else str(string)
+        if len(_FRAGMENTS) < MAX_FRAGMENTS:
+            _FRAGMENTS[code, string] = fragment
+        return fragment
+
+
 def red(string):
     """Return a string that will appear red in a terminal."""
-    return f"\033[1;91m{string}\033[0m"
+    return _style("1;91", string)
 
 
 def green(string):
     """Return a string that will appear green in a terminal."""
-    return f"\033[1;92m{string}\033[0m"
+    return _style("1;92", string)
 
 
 def yellow(string):
     """Return a string that will appear yellow in a terminal."""
-    return f"\033[1;93m{string}\033[0m"
+    return _style("1;93", string)
 
 
 def blue(string):
     """Return a string that will appear blue in a terminal."""
-    return f"\033[1;94m{string}\033[0m"
+    return _style("1;94", string)
 
 
 def bold(string):
     """Return a string that will appear bold in a terminal."""
-    return f"\033[1m{string}\033[0m"
+    return _style("1", string)
+
+
+class BufferedOutput:
+    """Stands in for an output stream, collecting everything written to
+    it until it's flushed, and then writing it all to the stream in one
+    go. input() flushes stdout before showing a prompt, so the output
+    still comes before the prompt it leads up to.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+        self._parts = []
+
+    def write(self, text):
+        self._parts.append(text)
+        return len(text)
+
+    def flush(self):
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts.clear()
+            self._stream.write(text)
+        self._stream.flush()
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Compile Tables
+
+Enumerates the whole input space of the modules that have a small one,
+evaluates every input through the solvers' own rules, in parallel across
+a pool of processes, and writes the answers out as lookup tables in
+compiled/. The solvers load these (see utils.load_table) in place of
+re-running the rules, as long as the rules haven't changed since.
+
+Where an answer depends on the bomb, it is evaluated under every
+combination of the bomb facts the module can use, and the answers are
+stored indexed by the combination.
+
+Run with the names of the modules to compile, or no arguments to compile
+all of them.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+
+import complicated_wires
+import needy_knob
+import simple_wires
+import utils
+from ktane import Bomb
+from utils import COMPILED_DIR, source_hash
+
+# Always evaluate the rules themselves, not the last tables compiled
+utils.USE_TABLES = False
+
+
+def _bomb(odd=False, batteries=0, car=False, frk=False, parallel=False):
+    """Return a non-interactive bomb with the given facts."""
+    return Bomb.from_dict({"serial": "AAAAA1" if odd else "AAAAA0",
+                           "batteries": batteries,
+                           "indicators": {"CAR": True if car else None,
+                                          "FRK": True if frk else None},
+                           "ports": {"parallel_port": parallel}})
+
+
+# Each module's table is built from chunks of its input space, each of
+# which is evaluated in a worker process. A chunk function takes one
+# item of the module's chunk list and returns a dict of entries. Tables
+# are stored as a dict of entries, unless the module has a pack function
+# to convert them to a more compact form.
+
+def _simple_wires_chunks():
+    return list(range(3, 7))
+
+
+def _simple_wires_chunk(length):
+    """Keyed by table index, with the packed answers for an even and an
+    odd serial. See simple_wires.wire_index.
+    """
+    bombs = [_bomb(odd=False), _bomb(odd=True)]
+    return {simple_wires.wire_index(wires):
+            [simple_wires.pack_answer(wires, simple_wires.evaluate_rules(wires, bomb))
+             for bomb in bombs]
+            for wires in simple_wires.all_wires(length)}
+
+
+def _simple_wires_pack(entries):
+    """Flatten the entries into the bytes table simple_wires.cut_table
+    expects, stored as hex.
+    """
+    table = bytearray(2 * simple_wires.TABLE_SIZE)
+    for index, answers in entries.items():
+        table[2 * index:2 * index + 2] = bytes(answers)
+    return table.hex()
+
+
+def _complicated_wires_chunks():
+    return list(itertools.product((False, True), repeat=3))
+
+
+def _complicated_wires_chunk(facts):
+    """Keyed by the index serial even * 4 + parallel port * 2 + two or
+    more batteries, with the cut vector for that bomb.
+    """
+    even, parallel, two_batteries = facts
+    bomb = _bomb(odd=not even, parallel=parallel, batteries=2 if two_batteries else 0)
+    index = even * 4 + parallel * 2 + two_batteries
+    return {str(index): list(complicated_wires.cut_vector(bomb))}
+
+
+def _needy_knob_chunks():
+    return [None]
+
+
+def _needy_knob_chunk(_):
+    """Keyed by light mask, with the packed entry for it. The whole table
+    is worked out at once, see needy_knob.pack_entry.
+    """
+    # pylint: disable=protected-access
+    return {mask: needy_knob.pack_entry(entry)
+            for mask, entry in enumerate(needy_knob._knob_table())}
+
+
+def _needy_knob_pack(entries):
+    """Flatten the entries into the bytes table needy_knob expects,
+    stored as hex.
+    """
+    return bytes(entries[mask] for mask in range(len(entries))).hex()
+
+
+def _as_dict(entries):
+    return {str(key): value for key, value in sorted(entries.items())}
+
+
+COMPILERS = {"simple_wires": (_simple_wires_chunks, _simple_wires_chunk, _simple_wires_pack),
+             "complicated_wires": (_complicated_wires_chunks, _complicated_wires_chunk, _as_dict),
+             "needy_knob": (_needy_knob_chunks, _needy_knob_chunk, _needy_knob_pack)}
+
+
+def _run_chunk(task):
+    module, chunk = task
+    return module, COMPILERS[module][1](chunk)
+
+
+def compile_tables(modules, output=COMPILED_DIR, processes=None):
+    """Compile the tables for the given modules, writing each to
+    output/<module>.json. Returns the number of entries in each table.
+    """
+    tasks = [(module, chunk) for module in modules for chunk in COMPILERS[module][0]()]
+    tables = {module: {} for module in modules}
+    with multiprocessing.Pool(processes) as pool:
+        for module, entries in pool.imap_unordered(_run_chunk, tasks):
+            tables[module].update(entries)
+
+    os.makedirs(output, exist_ok=True)
+    for module, table in tables.items():
+        path = os.path.join(output, f"{module}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as compiled:
+            json.dump({"source": source_hash(module), "table": COMPILERS[module][2](table)},
+                      compiled, separators=(",", ":"))
+        os.replace(f"{path}.tmp", path)
+    return {module: len(table) for module, table in tables.items()}
+
+
+def main(argv=None):
+    """Compile the requested tables."""
+    parser = argparse.ArgumentParser(description="Compile lookup tables for the KTANE solvers.")
+    parser.add_argument("modules", nargs="*",
+                        help=f"modules to compile, from {', '.join(COMPILERS)} (default: all)")
+    parser.add_argument("-o", "--output", default=COMPILED_DIR,
+                        help="directory to write the tables to (default: %(default)s)")
+    parser.add_argument("-j", "--processes", type=int,
+                        help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    for module in args.modules:
+        if module not in COMPILERS:
+            parser.error(f"unknown module: {module}")
+    for module, count in compile_tables(args.modules or list(COMPILERS), args.output,
+                                        args.processes).items():
+        print(f"{module:<20} {count:6} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,101 @@ star indicator and/or a lit light.
 """
 
 from colours import bold
+from utils import load_table, read_input
+
+
+def _serial_even(bomb):
+    return not bomb.serial_odd
+
+
+def _parallel_port(bomb):
+    return bomb.parallel_port.present
+
+
+def _two_batteries(bomb):
+    return bomb.battery_bucket >= 2
+
+
+def _always(bomb):  # pylint: disable=unused-argument
+    return True
+
+
+def _never(bomb):  # pylint: disable=unused-argument
+    return False
+
+
+# Whether to cut each of the 16 wire types, keyed by the sorted wire
+# attributes with white removed
+CUT_RULES = {"": _always, "B": _serial_even, "BL": _parallel_port,
+             "BLR": _serial_even, "BLRS": _never, "BLS": _parallel_port,
+             "BR": _serial_even, "BRS": _parallel_port, "BS": _never,
+             "L": _never, "LR": _two_batteries, "LRS": _two_batteries,
+             "LS": _two_batteries, "R": _serial_even, "RS": _always, "S": _always}
+
+
+def normalise_wire(wire):
+    """Convert a wire description such as "WSR" to its key in
+    CUT_RULES.
+    """
+    # We remove "W" from the strings since it doesn't affect any of the
+    # cuts. However, we do so _after_ we split, since otherwise we lose
+    # the plain white wires
+    return "".join(sorted(wire.upper())).replace("W", "")
+
+
+def should_cut(wire, bomb):
+    """Return True if the (normalised) wire should be cut. Bomb
+    attributes are only looked up if the rules need them.
+    """
+    return CUT_RULES[wire](bomb)
+
+
+# Each wire can also be encoded as a 4-bit integer, for evaluating many
+# wires at once
+WIRE_BITS = {"R": 1, "B": 2, "S": 4, "L": 8}
+WIRE_CODES = {wire: sum(WIRE_BITS[char] for char in wire) for wire in CUT_RULES}
+_RULES_BY_CODE = [None] * 16
+for _wire, _code in WIRE_CODES.items():
+    _RULES_BY_CODE[_code] = CUT_RULES[_wire]
+
+
+def encode_wires(wires):
+    """Encode an iterable of (normalised) wires as a bytes object with
+    one 4-bit code per wire.
+    """
+    return bytes(WIRE_CODES[wire] for wire in wires)
+
+
+def _cut_vector(bomb):
+    table = load_table("complicated_wires")
+    if table is None:
+        return tuple(rule(bomb) for rule in _RULES_BY_CODE)
+    index = _serial_even(bomb) * 4 + _parallel_port(bomb) * 2 + _two_batteries(bomb)
+    return tuple(table[str(index)])
+
+
+def cut_vector(bomb):
+    """Return a tuple of 16 bools saying whether to cut each wire code
+    on this bomb, which is cached on the bomb. Unlike should_cut, this
+    needs every bomb attribute the rules use.
+    """
+    return bomb.fact("complicated_wires.cut_vector", _cut_vector)
+
+
+def evaluate_wires(codes, vector):
+    """Return whether to cut each of an array of wire codes, given a
+    bomb's cut vector. For a bytes object of codes this is a bytes object
+    of 0s and 1s, for a NumPy integer array it's a bool array, and
+    otherwise a list of bools.
+    """
+    if isinstance(codes, (bytes, bytearray)):
+        return codes.translate(bytes(vector) + bytes(240))
+    if type(codes).__module__ == "numpy":
+        # Only imported if the caller is already using NumPy, since it's
+        # not otherwise a dependency
+        import numpy  # pylint: disable=import-outside-toplevel
+        return numpy.asarray(vector, dtype=bool)[codes]
+    return [vector[code] for code in codes]
 
 
 class ComplicatedWires:
@@ -19,29 +114,12 @@ class ComplicatedWires:
         self.wires = self.get_complicated_wire_sequence()
 
     def __repr__(self):
-        return self.wires
-
-    def print_function_lookup(self, wire):
-        """Return a lookup table matching wire attributes to functions
-        determining whether to cut the wire or not.
-        The table is constant, but due to limitations in Python, the
-        table cannot be stored as a class constant, and hence must be
-        wrapped in a function.
-        """
-        lookup = \
-            {"": self.cut, "B": self.serial_cut, "BL": self.p_port_cut,
-             "BLR": self.serial_cut, "BLRS": self.no_cut, "BLS": self.p_port_cut,
-             "BR": self.serial_cut, "BRS": self.p_port_cut, "BS": self.no_cut,
-             "L": self.no_cut, "LR": self.battery_cut, "LRS": self.battery_cut,
-             "LS": self.battery_cut, "R": self.serial_cut, "RS": self.cut, "S": self.cut}
-        return lookup[wire]
+        return " ".join(self.wires)
 
     @staticmethod
     def is_valid_wire(wire):
         """Return true if a supplied wire configuration is valid."""
-
-        return wire in set(["", "B", "BL", "BLR", "BLRS", "BLS", "BR", "BRS",
-                           "BS", "L", "LR", "LRS", "LS", "R", "RS", "S"])
+        return wire in CUT_RULES
 
     @staticmethod
     def cut():
@@ -53,42 +131,15 @@ class ComplicatedWires:
         """Informs the user NOT to cut the wire."""
         print(f"\nDo {bold('NOT')} cut the wire")
 
-    def _conditional_cut(self, condition):
-        """Informs the user to cut the wire if condition is true."""
-        self.cut() if condition else self.no_cut()
-
-    def serial_cut(self):
-        """Informs the user to cut the wire if the serial number is
-        even.
-        """
-        self._conditional_cut(int(self.bomb.serial[-1]) % 2 == 0)
-
-
-    def p_port_cut(self):
-        """Informs the user to cut the wire if the bomb has a
-        parallel port.
-        """
-        self._conditional_cut(self.bomb.parallel_port.present)
-
-    def battery_cut(self):
-        """Informs the user to cut the wire if the bomb has more than
-        two batteries.
-        """
-        self._conditional_cut(self.bomb.batteries >= 2)
-
     def get_complicated_wire_sequence(self):
         """Helper function to get wire sequence from user input, and
         validate it.
         """
         while True:
-            seq = input("\nInput a space-separated string representing the wires.\n"
-                        "Use 'R' for 'red', 'B' for 'blue', 'W' for 'white', "
-                        "'S' for star, and 'L' for light: ").upper()
-
-            # We remove "W" from the strings since it doesn't affect any of the
-            # cuts. However, we do so _after_ we split, since otherwise we lose
-            # the plain white wires
-            wires = ["".join(sorted(wire)).replace("W", "") for wire in seq.split()]
+            seq = read_input("\nInput a space-separated string representing the wires.\n"
+                             "Use 'R' for 'red', 'B' for 'blue', 'W' for 'white', "
+                             "'S' for star, and 'L' for light: ").upper()
+            wires = [normalise_wire(wire) for wire in seq.split()]
             if all(self.is_valid_wire(wire) for wire in wires):
                 break
             print(f"Invalid wire sequence: {seq}")
@@ -96,7 +147,8 @@ class ComplicatedWires:
 
     def solve(self):
         """Solve the complicated wires module."""
-        # We have 16 different cases to consider.
-        # We use a lookup table which runs the correct printing function.
         for wire in self.wires:
-            self.print_function_lookup(wire)()
+            if should_cut(wire, self.bomb):
+                self.cut()
+            else:
+                self.no_cut()
@@ -4,16 +4,17 @@ The Keypad module consists of four symbols arranged in a square.
 """
 
 from codecs import encode
+from itertools import combinations
 
 from colours import bold
 from utils import get_input
 
-COLUMNS = set([("Q", "AT", "LAMBDA", "N", "CAT", "H", "C"),
-               ("EURO", "Q", "C", "PHI", "STAR", "H", "QUESTION"),
-               ("C", "OMEGA", "PHI", "K", "3", "LAMBDA", "STAR"),
-               ("6", "PARAGRAPH", "TB", "CAT", "K", "QUESTION", "FACE"),
-               ("PHI", "FACE", "TB", "C", "PARAGRAPH", "3", "STAR"),
-               ("6", "EURO", "NOTEQUAL", "AE", "PSI", "N", "OMEGA")])
+COLUMNS = (("Q", "AT", "LAMBDA", "N", "CAT", "H", "C"),
+           ("EURO", "Q", "C", "PHI", "STAR", "H", "QUESTION"),
+           ("C", "OMEGA", "PHI", "K", "3", "LAMBDA", "STAR"),
+           ("6", "PARAGRAPH", "TB", "CAT", "K", "QUESTION", "FACE"),
+           ("PHI", "FACE", "TB", "C", "PARAGRAPH", "3", "STAR"),
+           ("6", "EURO", "NOTEQUAL", "AE", "PSI", "N", "OMEGA"))
 
 def rot13(string):
     """Enable rot-13 encoding of words so my code doesn't have smutty
@@ -23,83 +24,177 @@ def rot13(string):
 
 
 def get_symbol():
-    """Takes a string, and attempts to parse it to match to one of many
-    symbols.
+    """Prompts for a symbol description, and attempts to parse it to
+    match to one of many symbols.
     """
     # TODO there'll be an "official" name for these symbols - we could
     # use those? Or else print them out? Are we supporting terminals
     # that don't support full Unicode?
 
-    string = get_input("Input your symbol (either a close letter "
-                       "or very short description): ").replace("-", "")
-    # The list of valid symbols to return is as follows:
-    # Q, AT, LAMBDA, N, CAT, H, C, EURO, PHI, STAR, QUESTION,
-    # OMEGA, K, 3, 6, PARAGRAPH, TB, FACE, PSI, NOTEQUAL, AE
-    # Note that some symbols overlap, but this isn't a problem as they
-    # are all in separate columns
-    if string in ("Q", "QOPPA", "KOPPA", "WEIRDQ", "LOLLY", "LOLLIPOP",
-                  "LOLLYPOP", "POPSICLE"):
-        symbol = "Q"
-    elif string in ("AT", "TA", "WEIRDA", "A", "PYRAMID", "LADDER"):
-        symbol = "AT"
-    elif string in ("LAMBDA", "LAMBDALINE", "WEIRDLAMBDA", "LAMBDAWITHLINE"):
-        symbol = "LAMBDA"
-    elif string in ("N", "WEIRDN", "BACKWARDSN", "LIGHTNING", "BOLT", "LIGHTNINGBOLT",
-                    "THUNDER", "THUNDERBOLT", "NWITHHAT", "NHAT", "NSQUIGGLE", "NBREVE"):
-        symbol = "N"
-    elif string in ("CAT", "KITTY", "JELLYFISH", "WHAT", "WHAT?", "HWITHTRIANGLE",
-                    "HTRIANGLE"):
-        symbol = "CAT"
-    elif string in ("H", "CURLY H", "CURSIVEH", "GOTHICH", "HWITHTAIL", "HTAIL", "WEIRDH"):
-        symbol = "H"
-    elif string in ("C", "CWITHDOT", "CDOT", "BACKWARDC", "BACKWARDCDOT", "COPYRIGHT",
-                    "CINCIRCLE"):
-        symbol = "C"
-    elif string in ("EURO", "EUROUMLAUT", "EURODOTS", "E", "EDOTS", "BACKWARDSEURO"):
-        symbol = "EURO"
-    elif string in ("PHI", "SPRING", "COIL", "CURL", "CURLYQ"):
-        symbol = "PHI"
-    elif string in ("STAR", "WHITESTAR", "BLACKSTAR", "FILLEDINSTAR"):
-        symbol = "STAR"
-    elif string in ("QUESTION", "QUESTIONMARK", "UPSIDEDOWNQUESTIONMARK",
-                    "UPSIDEDOWNQUESTION", "?"):
-        symbol = "QUESTION"
+    return parse_symbol(get_input("Input your symbol (either a close letter "
+                                  "or very short description): "))
+
 
+# The list of valid symbols is as follows:
+# Q, AT, LAMBDA, N, CAT, H, C, EURO, PHI, STAR, QUESTION,
+# OMEGA, K, 3, 6, PARAGRAPH, TB, FACE, PSI, NOTEQUAL, AE
+# Note that some symbols overlap, but this isn't a problem as they
+# are all in separate columns. Where an alias is listed for more than
+# one symbol, the first symbol wins.
+SYMBOL_ALIASES = {
+    "Q": ("Q", "QOPPA", "KOPPA", "WEIRDQ", "LOLLY", "LOLLIPOP", "LOLLYPOP", "POPSICLE"),
+    "AT": ("AT", "TA", "WEIRDA", "A", "PYRAMID", "LADDER"),
+    "LAMBDA": ("LAMBDA", "LAMBDALINE", "WEIRDLAMBDA", "LAMBDAWITHLINE"),
+    "N": ("N", "WEIRDN", "BACKWARDSN", "LIGHTNING", "BOLT", "LIGHTNINGBOLT", "THUNDER",
+          "THUNDERBOLT", "NWITHHAT", "NHAT", "NSQUIGGLE", "NBREVE"),
+    "CAT": ("CAT", "KITTY", "JELLYFISH", "WHAT", "WHAT?", "HWITHTRIANGLE", "HTRIANGLE"),
+    "H": ("H", "CURLYH", "CURSIVEH", "GOTHICH", "HWITHTAIL", "HTAIL", "WEIRDH"),
+    "C": ("C", "CWITHDOT", "CDOT", "BACKWARDC", "BACKWARDCDOT", "COPYRIGHT", "CINCIRCLE"),
+    "EURO": ("EURO", "EUROUMLAUT", "EURODOTS", "E", "EDOTS", "BACKWARDSEURO"),
+    "PHI": ("PHI", "SPRING", "COIL", "CURL", "CURLYQ"),
+    "STAR": ("STAR", "WHITESTAR", "BLACKSTAR", "FILLEDINSTAR"),
+    "QUESTION": ("QUESTION", "QUESTIONMARK", "UPSIDEDOWNQUESTIONMARK",
+                 "UPSIDEDOWNQUESTION", "?"),
     # ROT-13 encoding here because SOME PEOPLE claim that this
     # symbol resembles various bodily parts, the names of which I
     # don't want in my code. IT'S AN OMEGA, EVERYONE!
-    elif string in ("OMEGA", "W", "WEIRDW", rot13("NFF"), rot13("OHZ"),
-                    rot13("OHGG"), rot13("OBBGL"), rot13("OBBOF"),
-                    rot13("OBBOVRF"), rot13("GVGF"), rot13("GVGGVRF"),
-                    rot13("ONYYF"), rot13("GRFGRF"), rot13("FPEBGHZ"),
-                    rot13("AHGFNPX"), rot13("AHGF"), "HEADPHONES"):
-        symbol = "OMEGA"
-    elif string in ("K", "Ж", "ZHE", "KS", "2K", "2KS", "TWOK", "TWOKS", "WEIRDX",
-                    "WEIRDK", "Z", "BACKTOBACKK", "BACKTOBACKKS"):
-        symbol = "K"
-    elif string in ("3", "WEIRD3", "HALF3", "UNFINISHED3", "THREE", "3WITHTAIL",
-                    "3WITHHORNS"):
-        symbol = "3"
-    elif string in ("6", "SIX", "FLAT6", "FLATSIX", "WEIRD6", "WEIRDSIX", "DELTA",
-                    "WEIRDDELTA"):
-        symbol = "6"
-    elif string in ("PARAGRAPH", "P", "WEIRDP", "BOLDP"):
-        symbol = "PARAGRAPH"
-    elif string in ("TB", "BT", "DT", "TD", "WEIRDB"):
-        symbol = "TB"
-    elif string in ("FACE", "SMILE", "SMILEY", "SMILEYFACE", "HAPPY",
-                    "HAPPYFACE"):
-        symbol = "FACE"
-    elif string in ("PSI", "TRIDENT", "FORK", "PITCHFORK"):
-        symbol = "PSI"
-    elif string in ("NOTEQUAL", "NOTEQUALS", "NOTEQUALSIGN", "HASH", "HASHTAG", "POUND",
-                    "POUNDSIGN", "WEIGHT", "WEIGHTS", "DUMBBELL", "WEIRDX", "CROSS"):
-        symbol = "NOTEQUAL"
-    elif string in ("AE", "Æ", "ASH"):
-        symbol = "AE"
-    else:
-        symbol = None
-    return symbol
+    "OMEGA": ("OMEGA", "W", "WEIRDW", "HEADPHONES",
+              *(rot13(word) for word in ("NFF", "OHZ", "OHGG", "OBBGL", "OBBOF", "OBBOVRF",
+                                         "GVGF", "GVGGVRF", "ONYYF", "GRFGRF", "FPEBGHZ",
+                                         "AHGFNPX", "AHGF"))),
+    "K": ("K", "Ж", "ZHE", "KS", "2K", "2KS", "TWOK", "TWOKS", "WEIRDX", "WEIRDK", "Z",
+          "BACKTOBACKK", "BACKTOBACKKS"),
+    "3": ("3", "WEIRD3", "HALF3", "UNFINISHED3", "THREE", "3WITHTAIL", "3WITHHORNS"),
+    "6": ("6", "SIX", "FLAT6", "FLATSIX", "WEIRD6", "WEIRDSIX", "DELTA", "WEIRDDELTA"),
+    "PARAGRAPH": ("PARAGRAPH", "P", "WEIRDP", "BOLDP"),
+    "TB": ("TB", "BT", "DT", "TD", "WEIRDB"),
+    "FACE": ("FACE", "SMILE", "SMILEY", "SMILEYFACE", "HAPPY", "HAPPYFACE"),
+    "PSI": ("PSI", "TRIDENT", "FORK", "PITCHFORK"),
+    "NOTEQUAL": ("NOTEQUAL", "NOTEQUALS", "NOTEQUALSIGN", "HASH", "HASHTAG", "POUND",
+                 "POUNDSIGN", "WEIGHT", "WEIGHTS", "DUMBBELL", "WEIRDX", "CROSS"),
+    "AE": ("AE", "Æ", "ASH"),
+}
+
+
+def _edit_distance(first, second):
+    """Return the Levenshtein distance between two strings."""
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, start=1):
+        current = [i]
+        for j, other in enumerate(second, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+class _BKTree:
+    """Burkhard-Keller tree of strings, for finding every string within
+    a given edit distance of a query without comparing against all of
+    them.
+    """
+    def __init__(self, words):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        """Add a word to the tree."""
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = _edit_distance(word, node[0])
+            if distance == 0:
+                return
+            if distance not in node[1]:
+                node[1][distance] = (word, {})
+                return
+            node = node[1][distance]
+
+    def search(self, word, max_distance):
+        """Return a list of (distance, word) pairs for every word in the
+        tree within max_distance of the given word.
+        """
+        matches = []
+        nodes = [self.root] if self.root else []
+        while nodes:
+            node_word, children = nodes.pop()
+            distance = _edit_distance(word, node_word)
+            if distance <= max_distance:
+                matches.append((distance, node_word))
+            # By the triangle inequality, only these children can match
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    nodes.append(child)
+        return matches
+
+
+ALIAS_LOOKUP = {}
+for _symbol, _aliases in SYMBOL_ALIASES.items():
+    for _alias in _aliases:
+        ALIAS_LOOKUP.setdefault(_alias, _symbol)
+_ALIAS_TREE = _BKTree(ALIAS_LOOKUP)
+
+
+def closest_symbol(string):
+    """Return the symbol whose alias is closest to a slightly misspelt
+    description, or None if nothing is close enough or the closest
+    aliases belong to different symbols. Very short descriptions must be
+    exact, since every short alias is within one edit of many others.
+    """
+    max_distance = min(len(string) // 4, 2)
+    matches = _ALIAS_TREE.search(string, max_distance) if max_distance else []
+    if not matches:
+        return None
+    best = min(distance for distance, _ in matches)
+    symbols = {ALIAS_LOOKUP[alias] for distance, alias in matches if distance == best}
+    return symbols.pop() if len(symbols) == 1 else None
+
+
+def parse_symbol(string):
+    """Takes a string, and attempts to parse it to match to one of many
+    symbols. Returns None if it matches none of them.
+    """
+    string = string.upper().replace(" ", "").replace("-", "")
+    try:
+        return ALIAS_LOOKUP[string]
+    except KeyError:
+        return closest_symbol(string)
+
+
+def _answer_table(columns):
+    """Map every set of four symbols in a column to the tuple of orders
+    in which they should be pressed. Since some of our names cover more
+    than one real symbol (e.g. "C"), a few sets appear in two columns,
+    in a different order in each.
+    """
+    table = {}
+    for col in columns:
+        for order in combinations(col, 4):
+            key = frozenset(order)
+            table[key] = table.get(key, ()) + (order,)
+    return table
+
+
+ANSWER_LOOKUP = _answer_table(COLUMNS)
+
+
+def keypad_orders(symbols):
+    """Return a tuple of the possible orders in which to press the four
+    given symbols. This is empty if no column contains all of them, and
+    only has more than one order if the symbols are ambiguous.
+    """
+    return ANSWER_LOOKUP.get(frozenset(symbols), ())
+
+
+def solve_keypads(keypads):
+    """Return the possible orders for each set of four symbols in an
+    iterable of keypads.
+    """
+    return [ANSWER_LOOKUP.get(frozenset(symbols), ()) for symbols in keypads]
+
 
 class Keypad:
     """Class to represent the Keypad module. Solving requires inputting
@@ -129,11 +224,14 @@ class Keypad:
             else:
                 symbols.add(string)
 
-        for col in COLUMNS:
-            if symbols.issubset(set(col)):
-                for item in col:
-                    if item in symbols:
-                        print(bold(item.capitalize()))
-                break
-        else:
+        orders = keypad_orders(symbols)
+        if not orders:
             print("No valid columns. Did you input the symbols correctly?")
+        elif len(orders) > 1:
+            print("These symbols appear in more than one column. "
+                  "Press them in one of these orders:")
+            for order in orders:
+                print(", ".join(bold(item.capitalize()) for item in order))
+        else:
+            for item in orders[0]:
+                print(bold(item.capitalize()))
@@ -10,19 +10,16 @@ modules and defuse bombs in Keep Talking and Nobody Explodes.
 # so silence those errors
 # pylint: disable=E1101
 
-import button
-import complicated_wires
-import keypad
-import maze
-import memory
-import morse
-import needy_knob
-import password
-import simon
-import simple_wires
-import wire_sequence
-import wof
-from utils import get_bool, get_input
+import importlib
+import json
+import os
+import sys
+from collections import namedtuple
+from types import SimpleNamespace
+
+from colours import BufferedOutput
+from utils import (PrefixTrie, StreamSource, get_bool, get_input, input_source, read_input,
+                   set_input_source)
 
 LOGO = r"""
  _   _______ ___   _   _  _____
@@ -41,6 +38,40 @@ LOGO = r"""
 \____/ \___/|_| \_/ \___|_|
 """
 
+SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".ktane_bomb.json")
+
+# The profiler.SessionProfiler timing each module solved, with --profile
+PROFILER = None
+
+# The solver for each module, as (class name, whether it needs the bomb).
+# Solver modules are only imported the first time they're needed, since
+# several of them build lookup tables at import time.
+SOLVERS = {"simple_wires": ("SimpleWires", True),
+           "button": ("Button", True),
+           "keypad": ("Keypad", False),
+           "simon": ("Simon", True),
+           "wof": ("WOF", False),
+           "memory": ("Memory", False),
+           "morse": ("Morse", False),
+           "complicated_wires": ("ComplicatedWires", True),
+           "wire_sequence": ("WireSequence", False),
+           "maze": ("Maze", False),
+           "password": ("Password", False),
+           "needy_knob": ("NeedyKnob", False)}
+
+
+def is_indicator_name(name):
+    """Return True if name can be an indicator, i.e. three capital
+    letters.
+    """
+    return isinstance(name, str) and len(name) == 3 and name.isalpha() and name.isupper()
+
+
+def is_port_name(name):
+    """Return True if name can be a port, e.g. "parallel_port"."""
+    return (isinstance(name, str) and name.endswith("_port") and name[0].isalpha()
+            and name.islower() and name.replace("_", "").isalnum())
+
 
 class Indicator:
     """Indicator object.
@@ -49,11 +80,14 @@ class Indicator:
     on the bomb.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, present=None, lit=None):
         self.name = name
-        self.present = get_bool(f"Is there an indicator with {self.name} (Y/N)? ")
+        if present is None:
+            present = get_bool(f"Is there an indicator with {self.name} (Y/N)? ")
+        self.present = present
         # If indicator not present, then obviously it cannot be lit
-        lit = None if self.present else False
+        if not self.present:
+            lit = False
         if lit is None:
             lit = get_bool(f"Is the indicator with label {self.name} lit (Y/N)? ")
         self.lit = lit
@@ -70,9 +104,11 @@ class Port:
     Holds information about ports present on the bomb.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, present=None):
         self.name = name
-        self.present = get_bool(f"Is there a {self.name} on the bomb (Y/N)? ")
+        if present is None:
+            present = get_bool(f"Is there a {self.name} on the bomb (Y/N)? ")
+        self.present = present
 
     def __repr__(self):
         status = "present" if self.present else "not present"
@@ -82,16 +118,57 @@ class Port:
         return self.present
 
 
+def _serial_odd(bomb):
+    return int(bomb.serial[-1]) % 2 == 1
+
+
+def _serial_vowel(bomb):
+    return not set("AEIOU").isdisjoint(bomb.serial.upper())
+
+
+def _battery_bucket(bomb):
+    return min(bomb.batteries, 3)
+
+
+def _feature_mask(bomb):
+    mask = 0
+    for value in vars(bomb).values():
+        if (isinstance(value, Indicator) and value.lit or
+                isinstance(value, Port) and value.present):
+            mask |= Bomb.FEATURE_BITS.get(value.name, 0)
+    return mask
+
+
 class Bomb:
     """Bomb object.
 
-    Holds configuration information for the bomb.
-    """
+    Holds configuration information for the bomb. An interactive bomb
+    prompts the user for any information it doesn't yet have, whereas a
+    non-interactive bomb (see from_dict) treats any indicator or port it
+    wasn't told about as absent, and raises ValueError for a missing or
+    invalid serial number or battery count.
 
-    def __init__(self):
+    If given an on_change callback, the bomb calls it with itself every
+    time it learns something new, e.g. to save a snapshot.
+
+    Facts derived from the bomb's attributes (e.g. serial_odd) are
+    cached until the serial, batteries, strikes, indicators or ports
+    change.
+    """
+    # Bits of feature_mask, for each standard indicator and port
+    FEATURE_BITS = {name: 1 << bit for bit, name in enumerate(
+        ("SND", "CLR", "CAR", "IND", "FRQ", "SIG", "NSA", "MSA", "TRN", "BOB", "FRK",
+         "dvi_port", "parallel_port", "ps2_port", "rj45_port", "serial_port",
+         "stereo_rca_port"))}
+
+    def __init__(self, interactive=True, on_change=None):
+        self.interactive = interactive
+        self.on_change = None
+        self._facts = {}
         self.serial = None
         self.batteries = None
         self.strikes = 0
+        self.on_change = on_change
 
     def __repr__(self):
         rep  = f"Bomb: serial: {self.serial}\n"
@@ -101,9 +178,109 @@ class Bomb:
         rep += f"      {self.FRK!r}"
         return rep
 
+    @classmethod
+    def from_dict(cls, data, interactive=False, on_change=None):
+        """Build a bomb (by default non-interactive) from a dict of the
+        form
+
+            {"serial": "AB1CD2", "batteries": 2, "strikes": 0,
+             "indicators": {"CAR": true, "FRK": false, "BOB": null},
+             "ports": {"parallel_port": true}}
+
+        An indicator maps to True if lit, False if unlit, and None if
+        known to be absent. Every key is optional. Raises ValueError for
+        indicator names that aren't three capital letters, or port names
+        that don't end in "_port".
+        """
+        indicators = data.get("indicators", {})
+        ports = data.get("ports", {})
+        for name in indicators:
+            if not is_indicator_name(name):
+                raise ValueError(f"Invalid indicator: {name}")
+        for name in ports:
+            if not is_port_name(name):
+                raise ValueError(f"Invalid port: {name}")
+        bomb = cls(interactive=interactive)
+        bomb.serial = data.get("serial")
+        bomb.batteries = data.get("batteries")
+        bomb.strikes = data.get("strikes", 0)
+        for name, lit in indicators.items():
+            setattr(bomb, name, Indicator(name, present=lit is not None, lit=bool(lit)))
+        for name, present in ports.items():
+            setattr(bomb, name, Port(name, present=bool(present)))
+        bomb.on_change = on_change
+        return bomb
+
+    def to_dict(self):
+        """Return everything known about the bomb, in the format taken
+        by from_dict. Anything not yet known is left out.
+        """
+        data = {"strikes": self.strikes}
+        if self.__serial is not None:
+            data["serial"] = self.__serial
+        if self.__batteries is not None:
+            data["batteries"] = self.__batteries
+        indicators = {}
+        ports = {}
+        for value in vars(self).values():
+            if isinstance(value, Indicator):
+                indicators[value.name] = value.lit if value.present else None
+            elif isinstance(value, Port):
+                ports[value.name] = value.present
+        if indicators:
+            data["indicators"] = indicators
+        if ports:
+            data["ports"] = ports
+        return data
+
+    def _changed(self):
+        """Forget derived facts and call on_change, after any of the
+        bomb's attributes change.
+        """
+        self._facts.clear()
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def fact(self, name, compute):
+        """Return a fact derived from the bomb's attributes, calling
+        compute(bomb) only if it isn't already cached. Modules can use
+        this to cache their own per-bomb tables.
+        """
+        try:
+            return self._facts[name]
+        except KeyError:
+            value = self._facts[name] = compute(self)
+            return value
+
+    @property
+    def serial_odd(self):
+        """Whether the last digit of the serial number is odd."""
+        return self.fact("serial_odd", _serial_odd)
+
+    @property
+    def serial_vowel(self):
+        """Whether the serial number contains a vowel."""
+        return self.fact("serial_vowel", _serial_vowel)
+
+    @property
+    def battery_bucket(self):
+        """The number of batteries, capped at 3, since no rule cares
+        about more than that.
+        """
+        return self.fact("battery_bucket", _battery_bucket)
+
+    @property
+    def feature_mask(self):
+        """A bitmask (see FEATURE_BITS) of the lit indicators and present
+        ports, out of those asked about so far.
+        """
+        return self.fact("feature_mask", _feature_mask)
+
     @property
     def serial(self):
         while self.__serial is None:
+            if not self.interactive:
+                raise ValueError("The bomb's serial number was not provided")
             self.serial = get_input("Input the bomb's serial number: ")
         return self.__serial
 
@@ -114,13 +291,18 @@ class Bomb:
             return
         if val.isalnum() and len(val) == 6 and (val[-1]).isdigit():
             self.__serial = val
-        else:
+            self._changed()
+        elif self.interactive:
             print("Invalid serial number")
+        else:
+            raise ValueError(f"Invalid serial number: {val}")
 
     @property
     def batteries(self):
         while self.__batteries is None:
-            self.batteries = input("Input the number of batteries on the bomb: ")
+            if not self.interactive:
+                raise ValueError("The bomb's number of batteries was not provided")
+            self.batteries = read_input("Input the number of batteries on the bomb: ")
         return self.__batteries
 
     @batteries.setter
@@ -131,16 +313,33 @@ class Bomb:
         try:
             self.__batteries = int(val)
         except ValueError:
+            if not self.interactive:
+                raise
             print("Invalid number of batteries")
+            return
+        self._changed()
+
+    @property
+    def strikes(self):
+        return self.__strikes
+
+    @strikes.setter
+    def strikes(self, val):
+        self.__strikes = val
+        self._changed()
 
     def __getattr__(self, attr):
-        if attr.isupper() and len(attr) == 3:  # Indicator
-            indicator = Indicator(attr)
+        # Non-interactive bombs were told about every indicator and port
+        # on them, so anything else is absent
+        if is_indicator_name(attr):
+            indicator = Indicator(attr, present=None if self.interactive else False)
             setattr(self, attr, indicator)
+            self._changed()
             return indicator
-        if attr.endswith("_port"):
-            port = Port(attr)
+        if is_port_name(attr):
+            port = Port(attr, present=None if self.interactive else False)
             setattr(self, attr, port)
+            self._changed()
             return port
         raise AttributeError(f"'{__class__.__name__}' object has no attribute '{attr}'")
 
@@ -149,62 +348,301 @@ class Bomb:
         self.strikes = 0
 
 
-def solve_modules():
+class BombContext:
+    """A bomb in a REPL session, and the solvers of any modules on it
+    that are part way through being solved.
+    """
+    def __init__(self, bomb):
+        self.bomb = bomb
+        self.solvers = {}
+
+
+class BombContexts:
+    """The bombs in a REPL session, by name, one of which is current.
+
+    If given a snapshot path, every bomb is saved there whenever any of
+    them learns something new, so they can be restored with
+    BombContexts.load. Modules part way through being solved aren't
+    saved.
+    """
+    FIRST = "BOMB1"
+
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot
+        self.contexts = {}
+        self.current = None
+
+    @property
+    def context(self):
+        """The current BombContext."""
+        return self.contexts[self.current]
+
+    @property
+    def bomb(self):
+        """The current bomb."""
+        return self.contexts[self.current].bomb
+
+    def new(self, name, data=None):
+        """Add a new bomb, from a dict of what's known about it (see
+        Bomb.from_dict) if given, and make it the current one.
+        """
+        if data is None:
+            bomb = Bomb(on_change=self.save)
+        else:
+            bomb = Bomb.from_dict(data, interactive=True, on_change=self.save)
+        self.contexts[name] = BombContext(bomb)
+        self.current = name
+        self.save()
+
+    def switch(self, name):
+        """Make the named bomb the current one, raising KeyError if there
+        isn't one.
+        """
+        if name not in self.contexts:
+            raise KeyError(name)
+        self.current = name
+        self.save()
+
+    def to_dict(self):
+        """Return everything known about every bomb."""
+        return {"current": self.current,
+                "bombs": {name: context.bomb.to_dict()
+                          for name, context in self.contexts.items()}}
+
+    def save(self, bomb=None):  # pylint: disable=unused-argument
+        """Write the bombs to the snapshot, if there is one. The snapshot
+        is replaced atomically, so a crash can't leave it half written.
+        """
+        if self.snapshot is None:
+            return
+        temp_path = f"{self.snapshot}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as snapshot:
+            json.dump(self.to_dict(), snapshot, separators=(",", ":"))
+        os.replace(temp_path, self.snapshot)
+
+    def forget(self):
+        """Delete the snapshot, so the bombs won't be restored."""
+        if self.snapshot is not None and os.path.exists(self.snapshot):
+            os.remove(self.snapshot)
+
+    @classmethod
+    def load(cls, path):
+        """Restore the bombs from a snapshot, which they will keep saving
+        to. Returns None if there is no snapshot, or it can't be read.
+        """
+        try:
+            with open(path, encoding="utf-8") as snapshot:
+                data = json.load(snapshot)
+            if "bombs" not in data:
+                # A snapshot of a single bomb, from before there could be
+                # several
+                data = {"current": cls.FIRST, "bombs": {cls.FIRST: data}}
+            contexts = cls()
+            for name, bomb in data["bombs"].items():
+                contexts.new(name, bomb)
+            if data["current"] not in contexts.contexts:
+                raise KeyError(data["current"])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError, AttributeError):
+            print(f"The snapshot in {path} couldn't be read, so starting again\n")
+            return None
+        contexts.current = data["current"]
+        contexts.snapshot = path
+        return contexts
+
+
+def load_solver(name):
+    """Return the solver class for a module, importing its module the
+    first time it's asked for.
+    """
+    class_name, _ = SOLVERS[name]
+    return getattr(importlib.import_module(name), class_name)
+
+
+def new_solver(name, bomb):
+    """Create a solver for a module on the given bomb."""
+    solver = load_solver(name)
+    return solver(bomb) if SOLVERS[name][1] else solver()
+
+
+def _solve(name):
+    """Return a command handler that solves the given module. Solvers
+    with a finished attribute are kept on the bomb until it's True, and
+    can carry on where they left off the next time the module is chosen.
+    """
+    def handler(contexts):
+        context = contexts.context
+
+        def solve():
+            # Many solvers prompt for their inputs when they're created,
+            # so that's part of solving them too
+            solver = context.solvers.pop(name, None)
+            # A strike resets some modules, and there can be more than one
+            # of a module, so check this is the same one
+            if solver is not None and not get_bool(
+                    f"Carry on with the {name} module in progress (Y/N)? "):
+                solver = None
+            if solver is None:
+                solver = new_solver(name, context.bomb)
+            solver.solve()
+            if not getattr(solver, "finished", True):
+                context.solvers[name] = solver
+
+        if PROFILER is None:
+            solve()
+        else:
+            PROFILER.run(name, solve)
+    return handler
+
+
+def _strike(contexts):
+    bomb = contexts.bomb
+    bomb.strikes += 1
+    print(f"The bomb now has {bomb.strikes} strike{'' if bomb.strikes == 1 else 's'}")
+
+
+def _num_strikes(contexts):
+    bomb = contexts.bomb
+    print(f"The bomb has {bomb.strikes} strike{'' if bomb.strikes == 1 else 's'}")
+
+
+def _reset_strikes(contexts):
+    contexts.bomb.reset_strikes()
+    print("Bomb strikes reset to 0")
+
+
+def _reset(contexts):
+    contexts.new(contexts.current)
+    print("Bomb config reset")
+
+
+def _new_bomb(contexts):
+    name = get_input("Name the new bomb: ")
+    if not name:
+        print("The bomb needs a name")
+    elif name in contexts.contexts:
+        print(f"There's already a bomb called {name}")
+    else:
+        contexts.new(name)
+        print(f"Now on bomb {name}")
+
+
+def _switch_bomb(contexts):
+    name = get_input(f"Which bomb? ({', '.join(contexts.contexts)}) ")
+    try:
+        contexts.switch(name)
+    except KeyError:
+        print(f"There's no bomb called {name}")
+    else:
+        print(f"Now on bomb {name}")
+
+
+def _list_bombs(contexts):
+    for name, context in contexts.contexts.items():
+        marker = "*" if name == contexts.current else " "
+        in_progress = "".join(f", {module} in progress" for module in context.solvers)
+        print(f" {marker} {name}: {context.bomb.to_dict()}{in_progress}")
+
+
+def _help(contexts):  # pylint: disable=unused-argument
+    get_help()
+
+
+def _exit(contexts):
+    # The defusal is over, so don't restore these bombs next time
+    contexts.forget()
+    print("\nWe hope your defusal was a success. Come again soon!\n")
+    return True
+
+
+# A command the user can type at the main prompt. The handler takes the
+# session's BombContexts, and returns True if the REPL should exit. The
+# first alias is the canonical one; usage is how the help menu shows it.
+Command = namedtuple("Command", ["aliases", "usage", "description", "handler"])
+
+MODULE_COMMANDS = (
+    Command(("SIMPLEWIRES", "SIMPLE", "WIRES"), "simple",
+            "Solve the simple wires module", _solve("simple_wires")),
+    Command(("BUTTON",), "button",
+            "Solve the button module", _solve("button")),
+    Command(("KEYPAD", "SYMBOL", "SYMBOLS", "SYM"), "symbols",
+            "Solve the symbol keypad module", _solve("keypad")),
+    Command(("SIMON", "SIMONSAYS"), "simon",
+            "Solve the Simon Says module", _solve("simon")),
+    Command(("WOF", "WHOSONFIRST", "WHO'SONFIRST"), "wof",
+            "Solve the \"Who's on first?\" module", _solve("wof")),
+    Command(("MEMORY",), "memory",
+            "Solve the memory module", _solve("memory")),
+    Command(("MORSE", "MORSECODE"), "morse",
+            "Solve the Morse code module", _solve("morse")),
+    Command(("COMPLICATEDWIRES", "COMPLICATED", "COMP"), "complicated",
+            "Solve the complicated wires module", _solve("complicated_wires")),
+    Command(("WIRESEQUENCE", "WIRESEQUENCES", "SEQUENCE", "SEQUENCES"), "sequence",
+            "Solve the wire sequence module", _solve("wire_sequence")),
+    Command(("MAZE", "MAZES"), "maze",
+            "Solve the maze module", _solve("maze")),
+    Command(("PASSWORD", "PASS"), "password",
+            "Solve the password module", _solve("password")),
+    Command(("NEEDYKNOB", "NEEDY", "KNOB", "DIAL"), "knob",
+            "Find correct position for needy knob", _solve("needy_knob")),
+)
+
+BOMB_COMMANDS = (
+    Command(("STRIKE",), "strike",
+            "Add a strike to the bomb", _strike),
+    Command(("NUMSTRIKES", "NUMSTRIKE"), "num strikes",
+            "Print the number of strikes currently on the bomb", _num_strikes),
+    Command(("RESETSTRIKES", "RESETSTRIKE"), "reset strike",
+            "Reset number of strikes on bomb to zero", _reset_strikes),
+    Command(("RESET", "RESETBOMB"), "reset",
+            "Reset the bomb configuration", _reset),
+    Command(("NEW", "NEWBOMB"), "new",
+            "Start another bomb, alongside the others", _new_bomb),
+    Command(("SWITCH", "SWITCHBOMB", "USE"), "switch",
+            "Switch to another bomb", _switch_bomb),
+    Command(("BOMBS", "LISTBOMBS", "LIST"), "bombs",
+            "List the bombs, and what's known about each", _list_bombs),
+    Command(("HELP", "H", "-H", "--HELP"), "help",
+            "Show this help menu", _help),
+    Command(("EXIT", "QUIT"), "exit",
+            "Exit the program, forgetting the bombs", _exit),
+)
+
+# Exact aliases are looked up directly; anything else is treated as an
+# abbreviation, and accepted if only one command has an alias starting
+# with it
+COMMAND_LOOKUP = {alias: command for command in MODULE_COMMANDS + BOMB_COMMANDS
+                  for alias in command.aliases}
+COMMAND_TRIE = PrefixTrie(COMMAND_LOOKUP.items())
+
+
+def find_command(string):
+    """Return the command for an alias, or an unambiguous abbreviation
+    of one, or None if there isn't one.
+    """
+    command = COMMAND_LOOKUP.get(string)
+    if command is None and string:
+        command = COMMAND_TRIE.unique(string)
+    return command
+
+
+def solve_modules(contexts):
     """Gets input from user regarding what module to solve/option to
-    run, and attempts to parse it as a valid choice. Currently is very
-    naive and almost certainly won't cover every option people would
-    want to give it.
+    run, and runs the matching command until the user exits.
     """
-    bomb = Bomb()
     while True:
-        module = None
-        func_to_call = get_input('Which module would you like to solve? '
-                                 '(type "help" for options): ')
-        if func_to_call in ("SIMPLEWIRES", "SIMPLE", "WIRES"):
-            module = simple_wires.SimpleWires(bomb)
-        elif func_to_call in ("BUTTON",):
-            module = button.Button(bomb)
-        elif func_to_call in ("SYMBOL", "SYMBOLS", "SYM", "KEYPAD"):
-            module = keypad.Keypad()
-        elif func_to_call in ("SIMON", "SIMONSAYS"):
-            module = simon.Simon(bomb)
-        elif func_to_call in ("WOF", "WHOSONFIRST", "WHO'SONFIRST"):
-            module = wof.WOF()
-        elif func_to_call in ("MEMORY",):
-            module = memory.Memory()
-        elif func_to_call in ("MORSE", "MORSECODE"):
-            module = morse.Morse()
-        elif func_to_call in ("COMP", "COMPLICATED", "COMPLICATEDWIRES"):
-            module = complicated_wires.ComplicatedWires(bomb)
-        elif func_to_call in ("SEQUENCE", "SEQUENCES", "WIRESEQUENCE", "WIRESEQUENCES"):
-            module = wire_sequence.WireSequence()
-        elif func_to_call in ("MAZE", "MAZES"):
-            module = maze.Maze()
-        elif func_to_call in ("PASSWORD", "PASS"):
-            module = password.Password()
-        elif func_to_call in ("NEEDY", "KNOB", "NEEDYKNOB", "DIAL"):
-            module = needy_knob.NeedyKnob()
-        elif func_to_call in ("STRIKE",):
-            bomb.strikes += 1
-            print(f"The bomb now has {bomb.strikes} strike{'' if bomb.strikes == 1 else 's'}")
-        elif func_to_call in ("NUMSTRIKE", "NUMSTRIKES"):
-            print(f"The bomb has {bomb.strikes} strike{'' if bomb.strikes == 1 else 's'}")
-        elif func_to_call in ("RESETSTRIKE", "RESETSTRIKES"):
-            bomb.reset_strikes()
-            print("Bomb strikes reset to 0")
-        elif func_to_call in ("RESET", "RESETBOMB"):
-            bomb = Bomb()
-            print("Bomb config reset")
-        elif func_to_call in ("HELP", "H", "-H", "--HELP"):
-            get_help()
-        elif func_to_call in ("EXIT", "QUIT"):
-            print("\nWe hope your defusal was a success. Come again soon!\n")
-            break
-        else:
+        # Only mention which bomb it is once there's more than one
+        on_bomb = f" on {contexts.current}" if len(contexts.contexts) > 1 else ""
+        command = find_command(get_input(f'Which module would you like to solve{on_bomb}? '
+                                         '(type "help" for options): '))
+        if command is None:
             print("Please try again")
-
-        if module:
-            module.solve()
+        elif command.handler(contexts):
+            return
+        # Prompts flush the output for the terminal, but scripted input
+        # has no prompts, so write out each command's output in one go
+        sys.stdout.flush()
 
 
 def get_help():
@@ -213,34 +651,82 @@ def get_help():
     print("\nKTANE Solver help")
     print("-"*50, end="\n\n")
     print("Valid commands:\n")
-    print("   simple         Solve the simple wires module")
-    print("   button         Solve the button module")
-    print("   symbols        Solve the symbol keypad module")
-    print("   simon          Solve the Simon Says module")
-    print("   wof            Solve the \"Who's on first?\" module")
-    print("   memory         Solve the memory module")
-    print("   complicated    Solve the complicated wires module")
-    print("   sequence       Solve the wire sequence module")
-    print("   maze           Solve the maze module")
-    print("   password       Solve the password module")
-    print("   knob           Find correct position for needy knob\n")
-
-    print("   strike         Add a strike to the bomb")
-    print("   num strikes    Print the number of strikes currently on the bomb")
-    print("   reset strike   Reset number of strikes on bomb to zero")
-    print("   reset          Reset the bomb configuration")
-    print("   help           Show this help menu")
-    print("   exit           Exit the program\n")
+    for commands in (MODULE_COMMANDS, BOMB_COMMANDS):
+        for command in commands:
+            print(f"   {command.usage:<15}{command.description}")
+        print("")
+
+
+def parse_args(argv):
+    """Parse the command line options."""
+    # argparse (and the re and enum modules it pulls in) is a sizeable
+    # chunk of start-up time, so it's only imported if there are any
+    # options to parse
+    if not argv:
+        return SimpleNamespace(snapshot=None, profile=None, cprofile=None, input=None)
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(description="An interactive manual for KTANE.")
+    parser.add_argument("--snapshot",
+                        help="file to save the bomb to, and restore it from if the "
+                             f"solver is restarted (default: {SNAPSHOT_PATH}, unless "
+                             "the input is scripted)")
+    parser.add_argument("--no-snapshot", dest="snapshot", action="store_const", const=False,
+                        help="don't save or restore the bomb")
+    parser.add_argument("--input", metavar="FILE",
+                        help="read the answers to the prompts from a file, or - for "
+                             "stdin, without showing the prompts (the default when "
+                             "stdin isn't a terminal)")
+    parser.add_argument("--profile", metavar="REPORT",
+                        help="time each module solved, split into waiting for input, "
+                             "compute and output, and write a JSON report on exit")
+    parser.add_argument("--cprofile", metavar="STATS",
+                        help="with --profile, also run the solvers under cProfile, "
+                             "and dump the stats on exit")
+    args = parser.parse_args(argv)
+    if args.cprofile and not args.profile:
+        parser.error("--cprofile requires --profile")
+    return args
 
 
 def main():
     """Creates the bomb object with the relevant info, then calls the
     desired function based on user input."""
+    global PROFILER  # pylint: disable=global-statement
+    args = parse_args(sys.argv[1:])
+    if args.profile:
+        from profiler import SessionProfiler  # pylint: disable=import-outside-toplevel
+        PROFILER = SessionProfiler(args.profile, args.cprofile)
+    if args.input not in (None, "-"):
+        # Left open until the solver exits
+        script = open(args.input, encoding="utf-8")  # pylint: disable=consider-using-with
+        set_input_source(StreamSource(script))
+    elif args.input == "-" or not sys.stdin.isatty():
+        set_input_source(StreamSource(sys.stdin))
 
     print(LOGO)
     print("Welcome to the KTANE solver!")
     print("We hope you have a successful defusal, with minimal death.\n")
-    solve_modules()
+    # Scripted runs shouldn't depend on a bomb left over from another
+    # run, so they only use a snapshot if they're asked to
+    snapshot = args.snapshot
+    if snapshot is None and input_source().interactive:
+        snapshot = SNAPSHOT_PATH
+    contexts = BombContexts.load(snapshot) if snapshot else None
+    if contexts is None:
+        contexts = BombContexts(snapshot or None)
+        contexts.new(BombContexts.FIRST)
+    else:
+        print("Restored the bombs from the previous session:")
+        _list_bombs(contexts)
+        print('Type "reset" to start again with the current bomb.\n')
+    stdout, sys.stdout = sys.stdout, BufferedOutput(sys.stdout)
+    try:
+        solve_modules(contexts)
+    finally:
+        sys.stdout.flush()
+        sys.stdout = stdout
+        if PROFILER is not None:
+            PROFILER.write_report()
 
 if __name__ == "__main__":
     try:
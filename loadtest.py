@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Load Test
+
+Drives a number of simulated sessions against a running server.py at
+once. Each session sets up a random bomb, then sends a stream of module
+requests one at a time, waiting for each reply. Reports the throughput
+and the latency of the replies.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+REQUESTS = [{"module": "simple_wires", "inputs": "RBYW"},
+            {"module": "button", "inputs": {"colour": "WHITE", "word": "HOLD"}},
+            {"module": "keypad", "inputs": ["LOLLIPOP", "AT", "LAMBDA", "LIGHTNING"]},
+            {"module": "simon", "inputs": "RBGY"},
+            {"module": "wof", "inputs": {"display": "YES", "button": "READY"}},
+            {"module": "morse", "inputs": ["...", "....", "."]},
+            {"module": "complicated_wires", "inputs": ["RW", "BSL", ""]},
+            {"module": "maze", "inputs": {"circle": [1, 5], "start": [1, 1], "end": [6, 6]}},
+            {"module": "password", "inputs": ["ABCDEF", "GHIJKL"]},
+            {"module": "needy_knob", "inputs": "001011111101"},
+            {"module": "wire_sequence", "panel": ["RA", "KC"]},
+            {"module": "wire_sequence", "undo": 1}]
+
+
+def _random_bomb(rng):
+    return {"serial": "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXZ0123456789", k=5))
+                      + rng.choice("0123456789"),
+            "batteries": rng.randrange(5),
+            "indicators": {"CAR": rng.choice((True, False, None)),
+                           "FRK": rng.choice((True, False, None))},
+            "ports": {"parallel_port": rng.random() < 0.5}}
+
+
+async def run_session(host, port, requests, seed, latencies):
+    """Run one session, appending the latency of each reply to
+    latencies. Returns the number of error replies, some of which are
+    expected, e.g. undoing a Wire Sequence panel when there isn't one.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        for i in range(requests):
+            request = {"bomb": _random_bomb(rng)} if i == 0 else dict(rng.choice(REQUESTS))
+            request["id"] = i
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if reply.get("id") != i:
+                raise RuntimeError(f"Reply out of order: {reply}")
+            errors += "error" in reply
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return errors
+
+
+async def load_test(host, port, sessions, requests):
+    """Run the sessions at once, and print a summary."""
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(run_session(host, port, requests, seed, latencies)
+                                    for seed in range(sessions)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1e3
+
+    print(f"{sessions} sessions, {len(latencies)} requests in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:,.0f} requests/s), {sum(errors)} error replies")
+    print(f"latency: p50 {percentile(0.5):.2f} ms, p90 {percentile(0.9):.2f} ms, "
+          f"p99 {percentile(0.99):.2f} ms, max {latencies[-1] * 1e3:.2f} ms")
+
+
+def main(argv=None):
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description="Load test a running KTANE session server.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="server address (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=7865,
+                        help="server port (default: %(default)s)")
+    parser.add_argument("-n", "--sessions", type=int, default=200,
+                        help="number of sessions to run at once (default: %(default)s)")
+    parser.add_argument("-r", "--requests", type=int, default=100,
+                        help="requests per session (default: %(default)s)")
+    args = parser.parse_args(argv)
+    asyncio.run(load_test(args.host, args.port, args.sessions, args.requests))
+
+
+if __name__ == "__main__":
+    main()
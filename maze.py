@@ -5,14 +5,18 @@ a controllable light and end point. To solve, you must move the light
 to the end without hitting any of the walls.
 """
 
+from collections import deque
 from copy import copy
 
+from utils import read_input
+
+
 def get_coords(string):
     """Prompt user for a coordinate on the maze, and return a tuple of
     ints representing a position on the 6x6 maze.
     """
     while True:
-        coords = input(string).strip('()[] ')
+        coords = read_input(string).strip('()[] ')
         try:
             if (len(coords) >= 2 and
             1 <= int(coords[0]) <= 6 and
@@ -24,17 +28,98 @@ def get_coords(string):
               "where 1 ≤ x,y ≤ 6\n")
 
 
+def DFS_maze(maze, start, end):
+    """Find the moves to get from start to end in the given maze by
+    performing a DFS. Returns None if start and end coincide.
+    """
+    return _DFS_maze_helper(maze, start, end, [])
+
+
+def _DFS_maze_helper(maze, player_pos, end, current_moves):
+    """Internal function to perform a DFS to solve the maze.
+    Has an extra bookkeeping parameter to track the putative
+    list of current moves that the _actual_ solving function
+    doesn't have
+    """
+    for move in maze[player_pos]:
+        # Check if move is backtracking
+        if len(current_moves) == 0 or move != -current_moves[-1]:
+            new_moves = copy(current_moves)
+            new_moves.append(move)
+            new_pos = list(player_pos)
+            if move in (LEFT, RIGHT):
+                new_pos[0] += move
+            else:
+                # UP/DOWN are encoded as +/- 2 respectively
+                new_pos[1] += move//2
+            new_pos = tuple(new_pos)
+            if new_pos == end:
+                return new_moves
+            possible_moves = _DFS_maze_helper(maze, new_pos, end, new_moves)
+
+            # If we get non-None output from the DFS, it found a solution,
+            # so propagate that down the call stack
+            if possible_moves is not None:
+                return possible_moves
+    return None
+
+
+def _move(pos, move):
+    """Return the position reached by making a move from pos."""
+    if move in (LEFT, RIGHT):
+        return pos[0] + move, pos[1]
+    # UP/DOWN are encoded as +/- 2 respectively
+    return pos[0], pos[1] + move//2
+
+
+def _shortest_routes(maze):
+    """Return a dict mapping every (start, end) pair in the maze to a
+    shortest tuple of moves between them, found by a BFS from each
+    start.
+    """
+    routes = {}
+    for start in maze:
+        paths = {start: ()}
+        queue = deque([start])
+        while queue:
+            pos = queue.popleft()
+            for move in maze[pos]:
+                new_pos = _move(pos, move)
+                if new_pos not in paths:
+                    paths[new_pos] = paths[pos] + (move,)
+                    queue.append(new_pos)
+        for end, moves in paths.items():
+            routes[start, end] = moves
+    return routes
+
+
+def shortest_route(circle, start, end):
+    """Return a shortest tuple of moves from start to end in the maze
+    with a green circle at the given coordinates.
+    """
+    return ROUTE_LOOKUP[circle][start, end]
+
+
+def shortest_routes(queries):
+    """Return a shortest tuple of moves for each (circle, start, end)
+    triple in an iterable of queries.
+    """
+    return [ROUTE_LOOKUP[circle][start, end] for circle, start, end in queries]
+
+
 class Maze:
     """Class to represent the Maze. Solving requires getting the
     location of a green circle on the maze to identify which maze it is,
-    as well as the start and end point. This solver then uses a DFS to
-    solve the maze and print out the required moves.
+    as well as the start and end point. This solver then looks up the
+    shortest route in a precomputed table and prints out the required
+    moves.
     """
     def __init__(self):
         while True:
             maze_ipt = get_coords("Enter the coordinates of any green circle in the maze: ")
             try:
                 self.maze = MAZE_LOOKUP[maze_ipt]
+                self.routes = ROUTE_LOOKUP[maze_ipt]
                 break
             except KeyError:
                 print("Invalid circle coordinates")
@@ -44,54 +129,22 @@ class Maze:
 
     def DFS_maze(self):
         """Find the moves to solve the maze module by performing a DFS"""
-        return self._DFS_maze_helper(self.start, self.end, [])
-
-
-    def _DFS_maze_helper(self, player_pos, end, current_moves):
-        """Internal function to perform a DFS to solve the maze.
-        Has an extra bookkeeping parameter to track the putative
-        list of current moves that the _actual_ solving function
-        doesn't have
-        """
-        for move in self.maze[player_pos]:
-            # Check if move is backtracking
-            if len(current_moves) == 0 or move != -current_moves[-1]:
-                new_moves = copy(current_moves)
-                new_moves.append(move)
-                new_pos = list(player_pos)
-                if move in (LEFT, RIGHT):
-                    new_pos[0] += move
-                else:
-                    # UP/DOWN are encoded as +/- 2 respectively
-                    new_pos[1] += move//2
-                new_pos = tuple(new_pos)
-                if new_pos == end:
-                    return new_moves
-                possible_moves = self._DFS_maze_helper(new_pos, end, new_moves)
-
-                # If we get non-None output from the DFS, it found a solution,
-                # so propagate that down the call stack
-                if possible_moves is not None:
-                    return possible_moves
-        return None
+        return DFS_maze(self.maze, self.start, self.end)
 
     def solve(self):
         """Solve the Maze module on the bomb."""
-        moves = self.DFS_maze()
-        print_moves(moves)
+        print_moves(self.routes[self.start, self.end])
 
 def print_moves(moves):
-    """Given a list of moves in the format outputted by the DFS, print
-    them in a more user-friendly format.
+    """Given a sequence of moves in the format outputted by the route
+    table, print them in a more user-friendly format.
     """
-    print("")  # New line
-    if moves is None:
-        print("No moves - maybe you specified the same start and end point?")
+    if not moves:
+        print("\nNo moves - maybe you specified the same start and end point?")
         return
 
-    for i, direction in enumerate(moves):
-        print(f"{str(i+1)}: {MOVE_LOOKUP[direction]}")
-    print("")  # New line
+    lines = "".join(f"{i}: {MOVE_LOOKUP[direction]}\n" for i, direction in enumerate(moves, 1))
+    print(f"\n{lines}")
 
 
 
@@ -224,6 +277,8 @@ MAZE_9 = {(1,1): [UP, RIGHT], (2,1): [LEFT, UP], (3,1): [UP, RIGHT],
           (4,6): [LEFT, RIGHT], (5,6): [LEFT, DOWN, RIGHT], (6,6): [LEFT, DOWN]}
 
 
+MAZES = (MAZE_1, MAZE_2, MAZE_3, MAZE_4, MAZE_5, MAZE_6, MAZE_7, MAZE_8, MAZE_9)
+
 MAZE_LOOKUP = {(1,5): MAZE_1, (6,4): MAZE_1,
                (2,3): MAZE_2, (5,5): MAZE_2,
                (4,3): MAZE_3, (6,3): MAZE_3,
@@ -233,3 +288,7 @@ MAZE_LOOKUP = {(1,5): MAZE_1, (6,4): MAZE_1,
                (2,1): MAZE_7, (2,6): MAZE_7,
                (3,3): MAZE_8, (4,6): MAZE_8,
                (1,2): MAZE_9, (3,5): MAZE_9}
+
+# Shortest routes between every pair of points, keyed by circle position
+_ROUTES = {id(maze): _shortest_routes(maze) for maze in MAZES}
+ROUTE_LOOKUP = {circle: _ROUTES[id(maze)] for circle, maze in MAZE_LOOKUP.items()}
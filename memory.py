@@ -17,18 +17,23 @@ class Input(IntEnum):
     POSITION = 2
 
 Stage = namedtuple("Stage", ["label", "position"])
+# Which button to press: by is either Input.LABEL or Input.POSITION
+Rule = namedtuple("Rule", ["by", "value"])
+RULE_TEXT = {Input.LABEL: "with", Input.POSITION: "in"}
 
 # Memory functions
 def _input(arg):
     """Gets input for the Memory module. Either asks for number on
     display, which value was in the button pressed, or which position
     the pressed button was in, depending on the argument provided.
+    Returns None if the user types "exit".
     """
 
     # Do-while for input
     while True:
         if arg == Input.DISPLAY:
-            ipt = get_input("Input the number on the display: ")
+            ipt = get_input('Input the number on the display (type "exit" to come back '
+                            'to this module later): ')
         elif arg == Input.LABEL:
             ipt = get_input("What value was in that position? ")
         elif arg == Input.POSITION:
@@ -36,11 +41,139 @@ def _input(arg):
         else:
             raise ValueError(f"Invalid argument: {arg}")
 
+        if ipt == "EXIT":
+            return None
         if ipt.isdigit() and 1 <= int(ipt) <= 4:
             print("")  # Blank line
             return int(ipt)
         print("Invalid input")
 
+def stage_rule(stage, display, stages):
+    """Return the Rule for which button to press in a stage (1-5), given
+    the number on the display and the Stages pressed so far.
+    """
+    # pylint: disable=too-many-return-statements
+    if stage == 1:
+        if display in (1, 2):
+            return Rule(Input.POSITION, 2)
+        if display in (3, 4):
+            return Rule(Input.POSITION, display)
+    elif stage == 2:
+        if display == 1:
+            return Rule(Input.LABEL, 4)
+        if display in (2, 4):
+            return Rule(Input.POSITION, stages[0].position)
+        if display == 3:
+            return Rule(Input.POSITION, 1)
+    elif stage == 3:
+        if display == 1:
+            return Rule(Input.LABEL, stages[1].label)
+        if display == 2:
+            return Rule(Input.LABEL, stages[0].label)
+        if display == 3:
+            return Rule(Input.POSITION, 3)
+        if display == 4:
+            return Rule(Input.LABEL, 4)
+    elif stage == 4:
+        if display == 1:
+            return Rule(Input.POSITION, stages[0].position)
+        if display == 2:
+            return Rule(Input.POSITION, 1)
+        if display in (3, 4):
+            return Rule(Input.POSITION, stages[1].position)
+    elif stage == 5:
+        if display in (1, 2):
+            return Rule(Input.LABEL, stages[display - 1].label)
+        if display == 3:
+            return Rule(Input.LABEL, stages[3].label)
+        if display == 4:
+            return Rule(Input.LABEL, stages[2].label)
+    else:
+        raise ValueError(f"Invalid memory stage: {stage}")
+    raise ValueError(f"Invalid option passed to memory stage {stage}: {display}")
+
+
+def press(rule, labels):
+    """Return the Stage actually pressed by following a rule, given the
+    labels of the four buttons in order.
+    """
+    if rule.by == Input.LABEL:
+        return Stage(rule.value, labels.index(rule.value) + 1)
+    return Stage(labels[rule.value - 1], rule.value)
+
+
+def solve_stages(displays, labels):
+    """Return the Stages pressed for a whole game, given the number on
+    the display and the four button labels for each of the five stages.
+    """
+    stages = []
+    for stage, (display, stage_labels) in enumerate(zip(displays, labels), start=1):
+        stages.append(press(stage_rule(stage, display, stages), stage_labels))
+    return stages
+
+
+# The state of a game in solve_game is a bytearray of 14 slots: the
+# constants 1-4, then the label and position pressed in each stage
+_STATE = bytes((1, 2, 3, 4)) + bytes(10)
+_LABEL_SLOT = 4
+_POSITION_SLOT = 5
+
+
+def _compile_rules():
+    """Work out where the value of each stage's rule comes from, as a
+    slot in the game state, by passing stage_rule stages whose labels and
+    positions are stand-in values (100 and up) for their own slots.
+    """
+    stages = [Stage(100 + 2 * stage, 101 + 2 * stage) for stage in range(4)]
+    rules = []
+    for stage in range(1, 6):
+        stage_rules = []
+        for display in range(1, 5):
+            by, value = stage_rule(stage, display, stages)
+            slot = value - 1 if value <= 4 else value - 100 + _LABEL_SLOT
+            stage_rules.append((by == Input.LABEL, slot))
+        rules.append(tuple(stage_rules))
+    return tuple(rules)
+
+
+def solve_game(displays, labels):
+    """Return the Stages pressed for a whole game, like solve_stages, but
+    using the rules compiled from stage_rule into COMPILED_RULES, with
+    the game's state in a fixed-size bytearray.
+    """
+    state = bytearray(_STATE)
+    slot = _LABEL_SLOT
+    stages = []
+    for stage_rules, display, stage_labels in zip(COMPILED_RULES, displays, labels):
+        if not 1 <= display <= 4:
+            raise ValueError(f"Invalid memory display: {display}")
+        by_label, value_slot = stage_rules[display - 1]
+        value = state[value_slot]
+        if by_label:
+            pressed = Stage(value, stage_labels.index(value) + 1)
+        else:
+            pressed = Stage(stage_labels[value - 1], value)
+        state[slot], state[slot + 1] = pressed
+        slot += 2
+        stages.append(pressed)
+    return stages
+
+
+def solve_games(games):
+    """Return the Stages pressed for each of an iterable of recorded
+    (displays, labels) games.
+    """
+    return [solve_game(displays, labels) for displays, labels in games]
+
+
+def check_games(games):
+    """Return the games, out of an iterable of (displays, labels) games,
+    for which solve_game and solve_stages disagree.
+    """
+    return [(displays, labels) for displays, labels in games
+            if solve_game(displays, labels) != solve_stages(displays, labels)]
+
+
 class Memory:
     """Class to represent the Memory module. Solving requires asking for
     the number on the display, and pressing either a certain number, or
@@ -50,88 +183,43 @@ class Memory:
     """
     def __init__(self):
         self.stages = []
+        self.finished = False
 
-    def stage_1(self):
-        """Solve and store results from stage 1 of the Memory Module."""
-        ipt = _input(Input.DISPLAY)
-        if ipt in (1, 2):
-            print(f'Press the button in {bold("POSITION 2")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), 2))
-        elif ipt == 3:
-            print(f'Press the button in {bold("POSITION 3")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), 3))
-        elif ipt == 4:
-            print(f'Press the button in {bold("POSITION 4")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), 4))
-        else:
-            raise ValueError(f"Invalid option passed to memory stage 1: {ipt}")
-
-    def stage_2(self):
-        """Solve and store results from stage 2 of the Memory Module."""
-        ipt = _input(Input.DISPLAY)
-        if ipt == 1:
-            print(f'Press the button with {bold("LABEL 4")}\n')
-            self.stages.append(Stage(4, _input(Input.POSITION)))
-        elif ipt in (2, 4):
-            print(f'Press the button in {bold(f"POSITION {self.stages[0].position}")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), self.stages[0].position))
-        elif ipt == 3:
-            print(f'Press the button in {bold("POSITION 1")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), 1))
-        else:
-            raise ValueError(f"Invalid option passed to memory stage 2: {ipt}")
-
-    def stage_3(self):
-        """Solve and store results from stage 3 of the Memory Module."""
-        ipt = _input(Input.DISPLAY)
-        if ipt == 1:
-            print(f'Press the button with {bold(f"LABEL {self.stages[1].label}")}\n')
-            self.stages.append(Stage(self.stages[1].label, _input(Input.POSITION)))
-        elif ipt == 2:
-            print(f'Press the button with {bold(f"LABEL {self.stages[0].label}")}\n')
-            self.stages.append(Stage(self.stages[0].label, _input(Input.POSITION)))
-        elif ipt == 3:
-            print(f'Press the button in {bold("POSITION 3")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), 3))
-        elif ipt == 4:
-            print(f'Press the button with {bold("LABEL 4")}\n')
-            self.stages.append(Stage(4, _input(Input.POSITION)))
-        else:
-            raise ValueError(f"Invalid option passed to memory stage 3: {ipt}")
-
-    def stage_4(self):
-        """Solve and store results from stage 4 of the Memory Module."""
-        ipt = _input(Input.DISPLAY)
-        if ipt == 1:
-            print(f'Press the button in {bold(f"POSITION {self.stages[0].label}")}\n')
-            self.stages.append(Stage(self.stages[0].label, _input(Input.POSITION)))
-        elif ipt == 2:
-            print(f'Press the button in {bold("POSITION 1")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), 1))
-        elif ipt in (3, 4):
-            print(f'Press the button in {bold(f"POSITION {self.stages[1].position}")}\n')
-            self.stages.append(Stage(_input(Input.LABEL), self.stages[1].position))
+    def stage(self, stage):
+        """Solve and store results from a stage (1-5) of the Memory
+        Module. Returns False if the user exits part way through.
+        """
+        display = _input(Input.DISPLAY)
+        if display is None:
+            return False
+        rule = stage_rule(stage, display, self.stages)
+        print(f'Press the button {RULE_TEXT[rule.by]} {bold(f"{rule.by.name} {rule.value}")}\n')
+        if stage == 5:
+            return True
+        if rule.by == Input.LABEL:
+            pressed = _input(Input.POSITION)
+            if pressed is None:
+                return False
+            self.stages.append(Stage(rule.value, pressed))
         else:
-            raise ValueError(f"Invalid option passed to memory stage 4: {ipt}")
-
-    def stage_5(self):
-        """Solve stage 5 of the Memory Module."""
-        ipt = _input(Input.DISPLAY)
-        if ipt == 1:
-            print(f'Press the button with {bold(f"LABEL {self.stages[0].label}")}\n')
-        elif ipt == 2:
-            print(f'Press the button with {bold(f"LABEL {self.stages[1].label}")}\n')
-        elif ipt == 3:
-            print(f'Press the button with {bold(f"LABEL {self.stages[3].label}")}\n')
-        elif ipt == 4:
-            print(f'Press the button with {bold(f"LABEL {self.stages[2].label}")}\n')
-        else:
-            raise ValueError(f"Invalid option passed to memory stage 5: {ipt}")
+            pressed = _input(Input.LABEL)
+            if pressed is None:
+                return False
+            self.stages.append(Stage(pressed, rule.value))
+        return True
 
     def solve(self):
-        """Solve the Memory module."""
-        self.stage_1()
-        self.stage_2()
-        self.stage_3()
-        self.stage_4()
-        self.stage_5()
+        """Solve the Memory module. If the user exits part way through,
+        solving it again carries on from the same stage.
+        """
+        if self.stages:
+            print(f"Carrying on from stage {len(self.stages) + 1}\n")
+        for stage in range(len(self.stages) + 1, 6):
+            if not self.stage(stage):
+                return
+        self.finished = True
+
+
+# For each stage and display, whether the rule presses by label, and the
+# slot of the game state holding the label or position to press
+COMPILED_RULES = _compile_rules()
@@ -7,6 +7,30 @@ Morse code, and a display to set a frequency.
 from colours import bold
 from utils import get_input
 
+def _cyclic_index(words):
+    """Map every cyclic substring of each word, up to the length of the
+    word, to the tuple of words containing it. Since the light loops,
+    the letters read so far can start anywhere in the word.
+    """
+    index = {}
+    for word in words:
+        looped = word * 2
+        for start in range(len(word)):
+            for end in range(start + 1, start + len(word) + 1):
+                index.setdefault(looped[start:end], []).append(word)
+    # A substring can appear twice in the same word, e.g. "L" in "SHELL"
+    return {letters: tuple(dict.fromkeys(matches)) for letters, matches in index.items()}
+
+
+def candidate_words(letters):
+    """Return the words consistent with the string of letters read so
+    far, in order.
+    """
+    if not letters:
+        return tuple(Morse.VALID_WORDS)
+    return CYCLIC_INDEX.get(letters, ())
+
+
 class Morse:
     """Class to represent the Morse module. Solving requires getting
     the Morse characters appearing on the light to decode the Morse into
@@ -53,24 +77,24 @@ class Morse:
 
     def solve(self):
         """Solves the Morse module."""
-        # Make a copy to remove words from when ruled out.
-        valid_words = dict(self.VALID_WORDS)
+        letters = ""
+        valid_words = candidate_words(letters)
         while len(valid_words) > 1:
             morse_character = self.get_morse_input()
             if morse_character is None:  # "EXIT" or "QUIT"
                 return
-
-            # Make a copy to iterate over, since we modify valid_words
-            valid_words_iter = dict(valid_words)
-            for word in valid_words_iter:
-                if morse_character not in word:
-                    del valid_words[word]
+            letters += morse_character
+            valid_words = candidate_words(letters)
 
         # Now we have at most one valid word
         if len(valid_words) == 0:
             print("Morse inputs do not match any known word. Please run module again.")
         else:
-            word, freq = valid_words.popitem()
+            word, = valid_words
+            freq = self.VALID_WORDS[word]
             print(f"\nThe word is {word}")
             freq_str = f"{freq:.3f}"  # Pad with zeroes
             print(f"The frequency is {bold(freq_str)} MHz\n")
+
+
+CYCLIC_INDEX = _cyclic_index(Morse.VALID_WORDS)
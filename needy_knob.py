@@ -6,28 +6,116 @@ indicate how to position the knob.
 """
 
 from colours import bold
-from utils import get_input
+from utils import get_input, load_table
 
 VALID_LIGHTS = {"44": "UP", "43": "UP", "53": "DOWN", "32": "DOWN",
                 "14": "LEFT", "03": "LEFT", "54": "RIGHT", "52": "RIGHT"}
 
+# The full layout of the twelve lights for each direction, as a 12-bit
+# mask of the top row then the bottom row, left to right
+LIGHT_PATTERNS = {0b001011_111101: "UP", 0b101010_011011: "UP",
+                  0b011001_111101: "DOWN", 0b101010_010001: "DOWN",
+                  0b000010_100111: "LEFT", 0b000010_000110: "LEFT",
+                  0b101111_111010: "RIGHT", 0b101100_111010: "RIGHT"}
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+# The directions a table entry can have, indexed by its packed form
+_ENTRY_DIRECTIONS = DIRECTIONS + (None,)
+
+
+def _knob_table():
+    """Return the (direction, distance) pair for every light mask, where
+    distance is the Hamming distance to the nearest pattern, and the
+    direction is None if patterns for different directions are equally
+    near.
+    """
+    popcount = bytes(bin(mask).count("1") for mask in range(1 << 12))
+    # The distance from every mask to the nearest pattern of each direction
+    distances = {}
+    for pattern, direction in LIGHT_PATTERNS.items():
+        to_pattern = [popcount[mask ^ pattern] for mask in range(1 << 12)]
+        if direction in distances:
+            to_pattern = list(map(min, distances[direction], to_pattern))
+        distances[direction] = to_pattern
+
+    table = []
+    for mask_distances in zip(*(distances[direction] for direction in DIRECTIONS)):
+        nearest = min(mask_distances)
+        if mask_distances.count(nearest) == 1:
+            table.append((DIRECTIONS[mask_distances.index(nearest)], nearest))
+        else:
+            table.append((None, nearest))
+    return tuple(table)
+
+
+def pack_entry(entry):
+    """Pack a (direction, distance) entry of KNOB_TABLE into a byte, for
+    compile_tables.py: the direction's index in DIRECTIONS (4 for None)
+    in the high nibble, and the distance in the low one.
+    """
+    direction, distance = entry
+    return _ENTRY_DIRECTIONS.index(direction) << 4 | distance
+
+
+def _load_knob_table():
+    """Return KNOB_TABLE from the table compile_tables.py compiled, or
+    work it out if there isn't an up to date one.
+    """
+    table = load_table("needy_knob")
+    try:
+        packed = bytes.fromhex(table)
+        entries = {code: (_ENTRY_DIRECTIONS[code >> 4], code & 0xF) for code in set(packed)}
+    except (TypeError, ValueError, IndexError):  # No table, or a corrupt one
+        packed = b""
+    if len(packed) != 1 << 12:
+        return _knob_table()
+    return tuple(map(entries.__getitem__, packed))
+
+
+def parse_light_mask(lights):
+    """Convert a string of twelve 0s and 1s (top row then bottom row) to
+    a light mask, raising ValueError if it isn't one.
+    """
+    if len(lights) != 12 or not set(lights) <= {"0", "1"}:
+        raise ValueError("Input the twelve lights as 0s and 1s, top row then bottom row")
+    return int(lights, 2)
+
+
+def classify_lights(mask):
+    """Return the (direction, distance) pair for a 12-bit light mask,
+    where distance is the number of lights that differ from the nearest
+    pattern. The direction is None if the nearest patterns disagree.
+    """
+    return KNOB_TABLE[mask]
+
 def get_knob_input():
-    """Prompt user for the number of lights lit on the left/right sides
-    sides of the module, and return it as a string.
+    """Prompt user for either the twelve lights on the module, returned
+    as a mask, or the number of lights lit on the left/right sides of the
+    module, returned as a string.
     """
     while True:
-        lights = get_input("\nInput the number of lit lights on the left hand side, "
-                           "and the number on the right: ")
-        if len(lights) < 2:
-            print("Input two separate numbers")
-        elif not lights[0].isdigit() or not lights[-1].isdigit():
-            print("Invalid string. Input two digits")
-        else:
-            normalised_lights = lights[0] + lights[-1]
-            if normalised_lights not in VALID_LIGHTS:
-                print("Invalid light sequence")
-            else:
-                return normalised_lights
+        lights = get_input("\nInput the lights as 0s and 1s, top row then bottom row, or "
+                           "the number of lit lights on the left hand side and the number "
+                           "on the right: ")
+        try:
+            if len(lights) == 12:
+                return parse_light_mask(lights)
+            return normalise_lights(lights)
+        except ValueError as err:
+            print(err)
+
+def normalise_lights(lights):
+    """Convert a string containing the number of lit lights on the left
+    and right sides to a key of VALID_LIGHTS, raising ValueError if it
+    isn't one.
+    """
+    if len(lights) < 2:
+        raise ValueError("Input two separate numbers")
+    if not lights[0].isdigit() or not lights[-1].isdigit():
+        raise ValueError("Invalid string. Input two digits")
+    normalised_lights = lights[0] + lights[-1]
+    if normalised_lights not in VALID_LIGHTS:
+        raise ValueError("Invalid light sequence")
+    return normalised_lights
 
 class NeedyKnob:
     """Class to represent the Needy Knob module. Solving requires
@@ -39,4 +127,18 @@ class NeedyKnob:
 
     def solve(self):
         """Solve the Needy Knob module."""
-        print(f'Turn knob {bold(VALID_LIGHTS[self.lights])} relative to "UP"')
+        if isinstance(self.lights, str):
+            direction, distance = VALID_LIGHTS[self.lights], 0
+        else:
+            direction, distance = classify_lights(self.lights)
+        if direction is None:
+            print("Those lights are as close to two different positions. Check them again")
+            return
+        if distance:
+            print(f"No exact match, going by the nearest layout "
+                  f"({distance} light{'' if distance == 1 else 's'} different)")
+        print(f'Turn knob {bold(direction)} relative to "UP"')
+
+
+# The (direction, distance) for every one of the 4096 light masks
+KNOB_TABLE = _load_knob_table()
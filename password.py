@@ -18,6 +18,78 @@ def get_password_input(letter_pos):
 
         print("Invalid letter sequence. Try again")
 
+class PasswordIndex:
+    """Index of a list of words, mapping each letter in each position to
+    a bitmask of the words with that letter there (bit i is set for the
+    i-th word). Narrowing down by a dial is then an OR over the dial's
+    letters and an AND with the current mask.
+    """
+    def __init__(self, words):
+        self.words = list(words)
+        self.all = (1 << len(self.words)) - 1
+        # Collect the word indices first, then build each mask in one
+        # go, since ORing bits into an ever larger int one at a time is
+        # quadratic in the number of words
+        indices = []
+        for i, word in enumerate(self.words):
+            for letter_pos, letter in enumerate(word):
+                if letter_pos == len(indices):
+                    indices.append({})
+                indices[letter_pos].setdefault(letter, []).append(i)
+        self.positions = [{letter: self._mask(bits) for letter, bits in letters.items()}
+                          for letters in indices]
+
+    def _mask(self, bits):
+        mask = bytearray((len(self.words) + 7) // 8)
+        for bit in bits:
+            mask[bit >> 3] |= 1 << (bit & 7)
+        return int.from_bytes(mask, "little")
+
+    def narrow(self, mask, letter_pos, letters):
+        """Return the subset of mask whose letter in the given position
+        is one of the letters on that dial.
+        """
+        if letter_pos >= len(self.positions):
+            return 0
+        position = self.positions[letter_pos]
+        dial = 0
+        for letter in set(letters):
+            dial |= position.get(letter, 0)
+        return mask & dial
+
+    def matching(self, dials):
+        """Return the mask of words consistent with the letters on each
+        of the given dials.
+        """
+        mask = self.all
+        for letter_pos, letters in enumerate(dials):
+            mask = self.narrow(mask, letter_pos, letters)
+        return mask
+
+    @staticmethod
+    def count(mask):
+        """Return the number of words in a mask."""
+        return bin(mask).count("1")
+
+    def words_in(self, mask):
+        """Return the words in a mask, in their original order."""
+        words = []
+        while mask:
+            low = mask & -mask
+            words.append(self.words[low.bit_length() - 1])
+            mask ^= low
+        return words
+
+
+def matching_passwords(dials, words=None):
+    """Return the passwords consistent with the letters on each of the
+    given dials, in order. A custom list of words can be given instead
+    of the standard passwords.
+    """
+    index = PASSWORD_INDEX if words is None else PasswordIndex(words)
+    return index.words_in(index.matching(dials))
+
+
 class Password:
     """Class to represent the Password module. Solving requires getting
     input from the user for each of the dials, and filtering down the
@@ -34,19 +106,14 @@ class Password:
     def solve(self):
         """Solve the password module."""
         letter_pos = 0
-        valid_passwords = self.VALID_PASSWORDS[:]
-        while len(valid_passwords) > 1:
+        mask = PASSWORD_INDEX.all
+        while PASSWORD_INDEX.count(mask) > 1:
             letters = get_password_input(letter_pos)
             if letters is None:  # "EXIT" or "QUIT"
                 return
-            letters = list(letters)
-            valid_passwords_iter = valid_passwords[:]
-            # We use the "master" copy of the password list so we can
-            # remove items from the copy whilst still correctly iterating
-            for word in valid_passwords_iter:
-                if word[letter_pos] not in letters:
-                    valid_passwords.remove(word)
+            mask = PASSWORD_INDEX.narrow(mask, letter_pos, letters)
             letter_pos += 1
+        valid_passwords = PASSWORD_INDEX.words_in(mask)
 
         # Now there is at most one word in the list. If there's none, the user
         # made an error and we tell them to try again
@@ -54,3 +121,6 @@ class Password:
             print("Invalid input letters")
         else:
             print(f"\nThe password is {bold(valid_passwords[0])}\n")
+
+
+PASSWORD_INDEX = PasswordIndex(Password.VALID_PASSWORDS)
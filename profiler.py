@@ -0,0 +1,139 @@
+"""Profiler
+
+Instruments a live REPL session. Each module solved is timed, and its
+wall time split into the time spent waiting at prompts, the time spent
+writing to the terminal, and the rest, which is the solver's own
+compute. The number of prompts each module issues is counted too.
+
+Prompts and output are timed by wrapping the input source (see
+utils.InputSource) and sys.stdout while a module is being solved, so the
+solvers don't need to know they're being profiled.
+"""
+
+import cProfile
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from utils import InputSource, input_source, set_input_source
+
+
+class _TimedSource(InputSource):
+    """Wraps an input source, counting a profiler's prompts and adding
+    the time spent waiting for them to its input wait. Writing the
+    prompt counts as waiting too, but not the output input() flushes
+    before it, which is already counted as render time.
+    """
+    def __init__(self, source, profiler):
+        self._source = source
+        self._profiler = profiler
+        self.interactive = source.interactive
+
+    def read(self, prompt):
+        self._profiler.prompts += 1
+        render = self._profiler.render
+        start = time.perf_counter()
+        try:
+            return self._source.read(prompt)
+        finally:
+            self._profiler.input_wait += (time.perf_counter() - start
+                                          - (self._profiler.render - render))
+
+
+class _TimedStream:
+    """Wraps an output stream, adding the time spent writing to it to a
+    profiler's render time.
+    """
+    def __init__(self, stream, profiler):
+        self._stream = stream
+        self._profiler = profiler
+
+    def write(self, text):
+        start = time.perf_counter()
+        try:
+            return self._stream.write(text)
+        finally:
+            self._profiler.render += time.perf_counter() - start
+
+    def flush(self):
+        start = time.perf_counter()
+        try:
+            self._stream.flush()
+        finally:
+            self._profiler.render += time.perf_counter() - start
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
+
+class SessionProfiler:
+    """Records timings for every module solved in a session, and writes
+    them out as a JSON report. If cprofile_path is given, the solvers are
+    also run under cProfile, and the combined stats are dumped there
+    (which slows down compute noticeably).
+    """
+    def __init__(self, report_path, cprofile_path=None):
+        self.report_path = report_path
+        self.cprofile = cProfile.Profile() if cprofile_path else None
+        self.cprofile_path = cprofile_path
+        self.started = datetime.now(timezone.utc)
+        self.invocations = []
+        # Running totals for the module being solved
+        self.input_wait = 0.0
+        self.render = 0.0
+        self.prompts = 0
+
+    def run(self, name, solve):
+        """Call solve(), recording how long it took solving the named
+        module.
+        """
+        self.input_wait = self.render = 0.0
+        self.prompts = 0
+        source = set_input_source(_TimedSource(input_source(), self))
+        real_stdout = sys.stdout
+        sys.stdout = _TimedStream(real_stdout, self)
+        start = time.perf_counter()
+        try:
+            if self.cprofile is None:
+                solve()
+            else:
+                self.cprofile.runcall(solve)
+            # Output may be buffered (see colours.BufferedOutput), so
+            # write it out while it's still being timed
+            sys.stdout.flush()
+        finally:
+            wall = time.perf_counter() - start
+            set_input_source(source)
+            sys.stdout = real_stdout
+            self.invocations.append({"module": name,
+                                     "wall": wall,
+                                     "input_wait": self.input_wait,
+                                     "compute": wall - self.input_wait - self.render,
+                                     "render": self.render,
+                                     "prompts": self.prompts})
+
+    def totals(self):
+        """Return the invocation timings summed up for each module."""
+        totals = {}
+        for invocation in self.invocations:
+            total = totals.setdefault(invocation["module"], {"invocations": 0})
+            total["invocations"] += 1
+            for key, value in invocation.items():
+                if key != "module":
+                    total[key] = total.get(key, 0) + value
+        return totals
+
+    def write_report(self):
+        """Write the JSON report, and the cProfile stats if there are
+        any.
+        """
+        report = {"started": self.started.isoformat(),
+                  "finished": datetime.now(timezone.utc).isoformat(),
+                  "invocations": self.invocations,
+                  "totals": self.totals()}
+        with open(self.report_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=4)
+            report_file.write("\n")
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(self.cprofile_path)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Server
+
+An asyncio server for running many defusal sessions at once over TCP.
+Each connection is a session with its own bomb, and speaks a line-based
+protocol: every line sent is a JSON request, and gets exactly one JSON
+reply line. Requests are of the form
+
+    {"bomb": {"serial": "AB1CD2", "batteries": 2}}
+        Replace the session's bomb (see ktane.Bomb.from_dict). Can be
+        combined with any of the requests below.
+    {"module": "simple_wires", "inputs": "RBYW"}
+        Solve a module on the session's bomb, as in batch.py.
+    {"module": "wire_sequence", "panel": ["RA", "KC"]}
+    {"module": "wire_sequence", "undo": 1}
+        Solve the next panel of the session's Wire Sequence module, or
+        roll back the last few panels.
+    {"command": "strike"}, {"command": "reset"}
+        Add a strike to the bomb, or start again with a new bomb.
+
+Replies are {"answer": ...} or {"error": "..."}, plus {"bomb": ...} for
+requests that change the bomb. An "id" in a request is copied into the
+reply. Sessions that go quiet for longer than the timeout are closed, as
+are sessions that stop reading their replies for that long.
+
+The solvers only take microseconds (see benchmark.py), so they run on
+the event loop itself, and each session yields to the others after
+every request.
+"""
+
+import argparse
+import asyncio
+import json
+
+import wire_sequence
+from batch import HANDLERS
+from ktane import Bomb
+
+# The most a client can send on one line, and the amount of unsent
+# replies at which a session stops reading until the client catches up
+MAX_LINE = 64 * 1024
+WRITE_BUFFER_HIGH = 64 * 1024
+
+# The errors a bad request can cause, which are reported to the client
+REQUEST_ERRORS = (ValueError, KeyError, IndexError, TypeError, AttributeError)
+
+
+class Session:
+    """The state of a single client: its bomb, and the modules that are
+    solved over several requests.
+    """
+    def __init__(self):
+        self.bomb = Bomb.from_dict({})
+        self.sequence = wire_sequence.SequenceState()
+
+    def _wire_sequence(self, request):
+        if "undo" in request:
+            self.sequence.undo(request["undo"])
+            return {"panels": self.sequence.panels}
+        wires = [wire.upper() for wire in request["panel"]]
+        for wire in wires:
+            if not wire_sequence.is_valid_wire_sequence(wire):
+                raise ValueError(f"Invalid wire: {wire}")
+        return self.sequence.submit(wires)
+
+    def _command(self, command):
+        if command == "strike":
+            self.bomb.strikes += 1
+        elif command == "reset":
+            self.bomb = Bomb.from_dict({})
+            self.sequence = wire_sequence.SequenceState()
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+    def handle(self, request):
+        """Carry out a request, returning the reply."""
+        reply = {}
+        if "id" in request:
+            reply["id"] = request["id"]
+        try:
+            if "bomb" in request:
+                self.bomb = Bomb.from_dict(request["bomb"])
+            if "command" in request:
+                self._command(request["command"])
+            if "bomb" in request or "command" in request:
+                reply["bomb"] = self.bomb.to_dict()
+            if "module" in request:
+                module = request["module"]
+                if module == "wire_sequence" and "inputs" not in request:
+                    reply["answer"] = self._wire_sequence(request)
+                elif module in HANDLERS:
+                    reply["answer"] = HANDLERS[module](self.bomb, request["inputs"])
+                else:
+                    raise ValueError(f"Unknown module: {module}")
+        except REQUEST_ERRORS as err:
+            reply["error"] = f"{type(err).__name__}: {err}"
+        return reply
+
+
+class SessionServer:
+    """Accepts connections, and runs a Session for each one."""
+    def __init__(self, timeout=300, max_sessions=1000):
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.sessions = 0
+
+    async def _reply(self, writer, reply):
+        """Send a reply, raising ConnectionError if the client doesn't
+        read enough of its replies within the timeout.
+        """
+        writer.write(json.dumps(reply, separators=(",", ":")).encode() + b"\n")
+        # Waits while the client has too many unread replies
+        try:
+            await asyncio.wait_for(writer.drain(), self.timeout)
+        except asyncio.TimeoutError:
+            # Closing would wait to send the unread replies, so drop them
+            writer.transport.abort()
+            raise ConnectionError("Client stopped reading replies") from None
+
+    async def handle_connection(self, reader, writer):
+        """Run a session until the client disconnects or times out."""
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        if self.sessions >= self.max_sessions:
+            try:
+                await self._reply(writer, {"error": "Too many sessions, try again later"})
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+        self.sessions += 1
+        session = Session()
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                except asyncio.TimeoutError:
+                    await self._reply(writer, {"error": "Session timed out"})
+                    break
+                except ValueError:  # The line was longer than MAX_LINE
+                    await self._reply(writer, {"error": "Request too long"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as err:
+                    reply = {"error": f"Invalid JSON: {err}"}
+                else:
+                    if isinstance(request, dict):
+                        reply = session.handle(request)
+                    else:
+                        reply = {"error": "Request must be a JSON object"}
+                await self._reply(writer, reply)
+                await asyncio.sleep(0)  # Let the other sessions run
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def serve(self, host, port):
+        """Serve sessions until cancelled."""
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving KTANE sessions on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    """Run the session server."""
+    parser = argparse.ArgumentParser(description="Serve KTANE defusal sessions over TCP.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=7865,
+                        help="port to listen on (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="seconds a session can be idle before it's closed "
+                             "(default: %(default)s)")
+    parser.add_argument("--max-sessions", type=int, default=1000,
+                        help="most sessions at once (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(SessionServer(args.timeout, args.max_sessions).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
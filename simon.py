@@ -4,19 +4,65 @@ The Simon module consists of four coloured buttons that flash in some
 sequence
 """
 
+import sys
+
 from colours import blue, green, red, yellow
 from utils import get_input
 
 
-def _is_valid_simon(string):
+def is_valid_simon(string):
     """Determine if the supplied Simon light sequence is valid."""
     return len(string) > 0 and all(char in "RBYG" for char in string)
 
 
-def _contains_vowels(string):
-    """Return True if the string contains any vowels, False otherwise.
+# The colour to press for each flashed colour, keyed by whether the
+# serial contains a vowel, and the number of strikes (capped at 2)
+COLOUR_MAPS = {(True, 0): {"R": "B", "B": "R", "G": "Y", "Y": "G"},
+               (True, 1): {"R": "Y", "B": "G", "G": "B", "Y": "R"},
+               (True, 2): {"R": "G", "B": "R", "G": "Y", "Y": "B"},
+               (False, 0): {"R": "B", "B": "Y", "G": "G", "Y": "R"},
+               (False, 1): {"R": "R", "B": "B", "G": "Y", "Y": "G"},
+               (False, 2): {"R": "Y", "B": "G", "G": "B", "Y": "R"}}
+
+# Each colour rendered on its own line
+COLOUR_LINES = {"R": red("RED") + "\n", "B": blue("BLUE") + "\n",
+                "G": green("GREEN") + "\n", "Y": yellow("YELLOW") + "\n"}
+_COLOUR_NAMES = {"R": "RED", "B": "BLUE", "G": "GREEN", "Y": "YELLOW"}
+
+# str.translate tables from flashed colours to the letters, or the
+# rendered lines, of the colours to press
+LETTER_TABLES = {key: str.maketrans(mapping) for key, mapping in COLOUR_MAPS.items()}
+RENDER_TABLES = {key: str.maketrans({flash: COLOUR_LINES[press]
+                                     for flash, press in mapping.items()})
+                 for key, mapping in COLOUR_MAPS.items()}
+# The whole conversion list for static Simon
+STATIC_TABLES = {key: "".join(f"{COLOUR_LINES[flash][:-1]}"
+                              f"{' ' * (6 - len(_COLOUR_NAMES[flash]))} -> "
+                              f"{COLOUR_LINES[press]}"
+                              for flash, press in mapping.items())
+                 for key, mapping in COLOUR_MAPS.items()}
+
+
+def table_key(vowels, strikes):
+    """Return the key into the Simon tables for a bomb."""
+    if strikes < 0:
+        raise ValueError(f"Invalid strike number: {strikes}")
+    return vowels, min(strikes, 2)
+
+
+def simon_sequence(lights, vowels, strikes):
+    """Return the sequence of colours to press for a valid sequence of
+    flashed lights.
     """
-    return set("AEIOUaeiou").isdisjoint(set(string))
+    return lights.translate(LETTER_TABLES[table_key(vowels, strikes)])
+
+
+def simon_sequences(batch):
+    """Return the sequence of colours to press for each (lights, vowels,
+    strikes) triple in an iterable, e.g. sequences from many bombs.
+    """
+    return [lights.translate(LETTER_TABLES[table_key(vowels, strikes)])
+            for lights, vowels, strikes in batch]
 
 
 def _get_simon_input():
@@ -26,7 +72,7 @@ def _get_simon_input():
                            '(type "exit" to exit): ')
         if lights == "EXIT":
             return None
-        if _is_valid_simon(lights):
+        if is_valid_simon(lights):
             return lights
         print("Invalid color sequence.")
 
@@ -44,49 +90,11 @@ class Simon:
     """
     def __init__(self, bomb):
         self.bomb = bomb
-        self.vowels = _contains_vowels(self.bomb.serial)
+        self.vowels = self.bomb.serial_vowel
 
     def static_simon(self):
         """Print the relevant colour conversion list for Simon."""
-        if self.vowels:
-            if self.bomb.strikes == 0:
-                print(f'{red("RED")}    -> {blue("BLUE")}')
-                print(f'{blue("BLUE")}   -> {yellow("YELLOW")}')
-                print(f'{green("GREEN")}  -> {green("GREEN")}')
-                print(f'{yellow("YELLOW")} -> {red("RED")}')
-
-            elif self.bomb.strikes == 1:
-                print(f'{red("RED")}    -> {red("RED")}')
-                print(f'{blue("BLUE")}   -> {blue("BLUE")}')
-                print(f'{green("GREEN")}  -> {yellow("YELLOW")}')
-                print(f'{yellow("YELLOW")} -> {green("GREEN")}')
-
-            elif self.bomb.strikes >= 2:
-                print(f'{red("RED")}    -> {yellow("YELLOW")}')
-                print(f'{blue("BLUE")}   -> {green("GREEN")}')
-                print(f'{green("GREEN")}  -> {blue("BLUE")}')
-                print(f'{yellow("YELLOW")} -> {red("RED")}')
-            else:
-                raise ValueError(f"Invalid strike number: {self.bomb.strikes}")
-
-        else:
-            if self.bomb.strikes == 0:
-                print(f'{red("RED")}    -> {blue("BLUE")}')
-                print(f'{blue("BLUE")}   -> {red("RED")}')
-                print(f'{green("GREEN")}  -> {yellow("YELLOW")}')
-                print(f'{yellow("YELLOW")} -> {green("GREEN")}')
-            elif self.bomb.strikes == 1:
-                print(f'{red("RED")}     -> {yellow("YELLOW")}')
-                print(f'{blue("BLUE")}    -> {green("GREEN")}')
-                print(f'{green("GREEN")}   -> {blue("BLUE")}')
-                print(f'{yellow("YELLOW")}  -> {red("RED")}')
-            elif self.bomb.strikes == 2:
-                print(f'{red("RED")}    -> {green("GREEN")}')
-                print(f'{blue("BLUE")}   -> {red("RED")}')
-                print(f'{green("GREEN")}  -> {yellow("YELLOW")}')
-                print(f'{yellow("YELLOW")} -> {blue("BLUE")}')
-            else:
-                raise ValueError(f"Invalid strike number: {self.bomb.strikes}")
+        sys.stdout.write(STATIC_TABLES[table_key(self.vowels, self.bomb.strikes)])
 
     def interactive_simon(self):
         """Prompts the user for the Simon input, and displays the correct
@@ -100,39 +108,8 @@ class Simon:
             if lights is None:
                 return
 
-            if self.vowels:
-                if self.bomb.strikes == 0:
-                    colour_dict = {"R": "B", "B": "Y", "G": "G", "Y": "R"}
-                elif self.bomb.strikes == 1:
-                    colour_dict = {"R": "R", "B": "B", "G": "Y", "Y": "G"}
-                elif self.bomb.strikes >= 2:
-                    colour_dict = {"R": "Y", "B": "G", "G": "B", "Y": "R"}
-                else:
-                    raise ValueError(f"Invalid strike number: {self.bomb.strikes}")
-            else:
-                if self.bomb.strikes == 0:
-                    colour_dict = {"R": "B", "B": "R", "G": "Y", "Y": "G"}
-                elif self.bomb.strikes == 1:
-                    colour_dict = {"R": "Y", "B": "G", "G": "B", "Y": "R"}
-                elif self.bomb.strikes >= 2:
-                    colour_dict = {"R": "G", "B": "R", "G": "Y", "Y": "B"}
-                else:
-                    raise ValueError(f"Invalid strike number: {self.bomb.strikes}")
-
-            for char in lights:
-                colour = colour_dict[char]
-                if colour == "R":
-                    print(red("RED"))
-                elif colour == "B":
-                    print(blue("BLUE"))
-                elif colour == "G":
-                    print(green("GREEN"))
-                elif colour == "Y":
-                    print(yellow("YELLOW"))
-                else:
-                    raise ValueError(f"Invalid colour: {colour}")
-            print("")  # Blank line
-
+            table = RENDER_TABLES[table_key(self.vowels, self.bomb.strikes)]
+            sys.stdout.write(lights.translate(table) + "\n")  # Blank line after
 
     def solve(self):
         """Solve the Simon module."""
@@ -4,10 +4,14 @@ The Simple Wires module consists of 3-6 horizontal wires with various
 possible colours.
 """
 
-from utils import get_input
+import itertools
+from functools import lru_cache
+from types import SimpleNamespace
+
+from utils import get_input, load_table
 from colours import bold
 
-def _is_valid_simple_wires(wires):
+def is_valid_simple_wires(wires):
     """Helper function to determine if the wire arrangement specified
     is valid.
     """
@@ -19,6 +23,148 @@ def _is_valid_simple_wires(wires):
     return True
 
 
+def _solve_3_wires(wires, bomb):  # pylint: disable=unused-argument
+    if "R" not in wires:
+        return "SECOND"
+    if wires[-1] == "W":
+        return "LAST"
+    if wires.count("B") > 1:
+        return "LAST BLUE"
+    return "LAST"
+
+
+def _solve_4_wires(wires, bomb):
+    if wires.count("R") > 1 and bomb.serial_odd:
+        return "LAST RED"
+    if wires[-1] == "Y" and "R" not in wires:
+        return "FIRST"
+    if wires.count("B") == 1:
+        return "FIRST"
+    if wires.count("Y") > 1:
+        return "LAST"
+    return "SECOND"
+
+
+def _solve_5_wires(wires, bomb):
+    if wires[-1] == "K" and bomb.serial_odd:
+        return "FOURTH"
+    if wires.count("R") == 1 and wires.count('Y') > 1:
+        return "FIRST"
+    if "K" not in wires:
+        return "SECOND"
+    return "FIRST"
+
+
+def _solve_6_wires(wires, bomb):
+    if "Y" not in wires and bomb.serial_odd:
+        return "THIRD"
+    if wires.count("Y") == 1 and wires.count("W") > 1:
+        return "FOURTH"
+    if "R" not in wires:
+        return "LAST"
+    return "FOURTH"
+
+
+_SOLVERS = {3: _solve_3_wires, 4: _solve_4_wires, 5: _solve_5_wires, 6: _solve_6_wires}
+
+
+def evaluate_rules(wires, bomb):
+    """Return a description of the wire to cut for a valid wire
+    sequence, by running through the rules in the manual.
+    """
+    return _SOLVERS[len(wires)](wires, bomb)
+
+
+# Every valid wire sequence has a unique index into the compiled table:
+# its colours read as a base-5 number, offset by the number of shorter
+# sequences. The table has two bytes per sequence, the answer with an
+# even and then an odd serial, each packed as (ANSWERS index << 3) |
+# the 0-based position of the wire to cut.
+WIRE_DIGITS = str.maketrans("KBYRW", "01234")
+_OFFSETS = {3: 0, 4: 5**3, 5: 5**3 + 5**4, 6: 5**3 + 5**4 + 5**5}
+TABLE_SIZE = 5**3 + 5**4 + 5**5 + 5**6
+ANSWERS = ("FIRST", "SECOND", "THIRD", "FOURTH", "LAST", "LAST BLUE", "LAST RED")
+_ANSWER_CODES = {answer: code for code, answer in enumerate(ANSWERS)}
+
+
+def wire_index(wires):
+    """Return the index of a valid wire sequence in the compiled table."""
+    return _OFFSETS[len(wires)] + int(wires.translate(WIRE_DIGITS), 5)
+
+
+def pack_answer(wires, answer):
+    """Pack a description of the wire to cut into a table entry."""
+    if answer == "LAST":
+        position = len(wires) - 1
+    elif answer == "LAST BLUE":
+        position = wires.rindex("B")
+    elif answer == "LAST RED":
+        position = wires.rindex("R")
+    else:
+        position = _ANSWER_CODES[answer]
+    return _ANSWER_CODES[answer] << 3 | position
+
+
+def all_wires(length):
+    """Return every wire sequence of a given length, in table order."""
+    return ["".join(wires) for wires in itertools.product("KBYRW", repeat=length)]
+
+
+def _table_from_rules():
+    table = bytearray(2 * TABLE_SIZE)
+    even, odd = SimpleNamespace(serial_odd=False), SimpleNamespace(serial_odd=True)
+    for length in _OFFSETS:
+        for wires in all_wires(length):
+            index = 2 * wire_index(wires)
+            table[index] = pack_answer(wires, evaluate_rules(wires, even))
+            table[index + 1] = pack_answer(wires, evaluate_rules(wires, odd))
+    return bytes(table)
+
+
+def cut_table():
+    """Return the compiled table of packed answers for every wire
+    sequence. It is loaded from compiled/ if compile_tables.py has been
+    run, and otherwise built from the rules.
+    """
+    try:
+        table = bytes.fromhex(load_table("simple_wires"))
+    except (TypeError, ValueError):  # No table, or a corrupt one
+        table = b""
+    return table if len(table) == 2 * TABLE_SIZE else _table_from_rules()
+
+
+@lru_cache(maxsize=None)
+def cut_lookup():
+    """Return a dict from every valid wire sequence to its pair of packed
+    answers in the compiled table, built the first time it's needed.
+    Hashing the string is quicker than working out its table index.
+    """
+    table = cut_table()
+    sequences = itertools.chain.from_iterable(all_wires(length) for length in _OFFSETS)
+    return {wires: (table[2 * index], table[2 * index + 1])
+            for index, wires in enumerate(sequences)}
+
+
+def wire_to_cut(wires, bomb):
+    """Return a description of the wire to cut (e.g. "LAST BLUE") for a
+    valid wire sequence. The bomb's serial number is only looked up if
+    the answer depends on it.
+    """
+    even, odd = cut_lookup()[wires]
+    if even != odd and bomb.serial_odd:
+        return ANSWERS[odd >> 3]
+    return ANSWERS[even >> 3]
+
+
+def cut_indices(pairs):
+    """Return the 0-based position of the wire to cut for each (wires,
+    serial) pair in an iterable of valid wire sequences and serial
+    numbers, e.g. from replays of many bombs.
+    """
+    lookup = cut_lookup()
+    return [lookup[wires][serial[-1] in "13579"] & 7 for wires, serial in pairs]
+
+
 class SimpleWires:
     """Class to represent the SimpleWires module. Solving requires
     inputting the list of wire colours, and then cutting a wire
@@ -30,7 +176,7 @@ class SimpleWires:
         while True:
             wire_sequence = get_input("Input the wire sequence. Use one letter per wire. "
                                       "Use 'K' for black: ")
-            if _is_valid_simple_wires(wire_sequence):
+            if is_valid_simple_wires(wire_sequence):
                 self.wires = wire_sequence
                 break
             print("Invalid wire sequence")
@@ -39,52 +185,9 @@ class SimpleWires:
     def __repr__(self):
         return self.wires
 
-    def _solve_3_wires(self):
-        if "R" not in self.wires:
-            print(f'\nCut the {bold("SECOND")} wire\n')
-        elif self.wires[-1] == "W":
-            print(f'\nCut the {bold("LAST")} wire')
-        elif self.wires.count("B") > 1:
-            print(f'\nCut the {bold("LAST BLUE")} wire\n')
-        else:
-            print(f'\nCut the {bold("LAST")} wire\n')
-
-    def _solve_4_wires(self):
-        if self.wires.count("R") > 1 and int(self.bomb.serial[-1]) % 2 == 1:
-            print(f'\nCut the {bold("LAST RED")}  wire\n')
-        elif self.wires[-1] == "Y" and "R" not in self.wires:
-            print(f'\nCut the {bold("FIRST")} wire\n')
-        elif self.wires.count("B") == 1:
-            print(f'\nCut the {bold("FIRST")} wire\n')
-        elif self.wires.count("Y") > 1:
-            print(f'\nCut the {bold("LAST")} wire\n')
-        else:
-            print(f'\nCut the {bold("SECOND")} wire\n')
-
-    def _solve_5_wires(self):
-        if self.wires[-1] == "K" and int(self.bomb.serial[-1]) % 2 == 1:
-            print(f'\nCut the {bold("FOURTH")} wire\n')
-        elif self.wires.count("R") == 1 and self.wires.count('Y') > 1:
-            print(f'\nCut the {bold("FIRST")} wire\n')
-        elif "K" not in self.wires:
-            print(f'\nCut the {bold("SECOND")} wire\n')
-        else:
-            print(f'\nCut the {bold("FIRST")} wire\n')
-
-    def _solve_6_wires(self):
-        if "Y" not in self.wires and int(self.bomb.serial[-1]) % 2 == 1:
-            print(f'\nCut the {bold("THIRD")} wire\n')
-        elif self.wires.count("Y") == 1 and self.wires.count("W") > 1:
-            print(f'\nCut the {bold("FOURTH")} wire\n')
-        elif "R" not in self.wires:
-            print(f'\nCut the {bold("LAST")} wire\n')
-        else:
-            print(f'\nCut the {bold("FOURTH")} wire\n')
-
     def solve(self):
         """Solve the simple wires module on the bomb. The user inputs the
         sequence of wires, and the function tells the user which one to
         cut.
         """
-        solver = getattr(self, f"_solve_{len(self.wires)}_wires")
-        solver()
+        print(f'\nCut the {bold(wire_to_cut(self.wires, self.bomb))} wire\n')
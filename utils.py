@@ -1,8 +1,94 @@
+import json
+import os
+
+# Where compile_tables.py writes its lookup tables
+COMPILED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "compiled")
+
+# Whether load_table should use the compiled tables at all
+USE_TABLES = True
+_TABLES = {}
+
+
+class InputSource:
+    """Somewhere the solvers read their input from, a line at a time.
+    read() returns the next line without its newline, and raises
+    EOFError when there are no more. Only interactive sources show the
+    prompt; the rest never write it, so scripted runs don't spend any
+    time on output nobody reads.
+    """
+    interactive = False
+
+    def read(self, prompt):
+        """Return the next line of input."""
+        raise NotImplementedError
+
+
+class TTYSource(InputSource):
+    """Reads what the user types at the terminal."""
+    interactive = True
+
+    def read(self, prompt):
+        return input(prompt)
+
+
+class ScriptedSource(InputSource):
+    """Reads from a list of lines given up front."""
+    def __init__(self, lines):
+        self._lines = iter(lines)
+
+    def read(self, prompt):
+        try:
+            return next(self._lines)
+        except StopIteration:
+            raise EOFError from None
+
+
+class StreamSource(InputSource):
+    """Reads from a file or pipe."""
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read(self, prompt):
+        line = self._stream.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip("\r\n")
+
+
+class SocketSource(StreamSource):
+    """Reads from a connected socket."""
+    def __init__(self, sock, encoding="utf-8"):
+        super().__init__(sock.makefile("r", encoding=encoding, newline=""))
+        self.socket = sock
+
+
+_SOURCE = TTYSource()
+
+
+def input_source():
+    """Return the source all input is currently read from."""
+    return _SOURCE
+
+
+def set_input_source(source):
+    """Read all input from source from now on, returning the source it
+    was read from before.
+    """
+    global _SOURCE  # pylint: disable=global-statement
+    previous, _SOURCE = _SOURCE, source
+    return previous
+
+
+def read_input(string):
+    """Read a line of input, exactly as it was given."""
+    return _SOURCE.read(string)
+
+
 def get_input(string):
     """Removes spaces and forces uppercase for all inputs to ensured
     uniformity.
     """
-    return input(string).upper().replace(' ', '')
+    return _SOURCE.read(string).upper().replace(' ', '')
 
 
 def get_bool(string):
@@ -13,3 +99,75 @@ def get_bool(string):
         if value.startswith("N"):
             return False
         print("Invalid input")
+
+
+class PrefixTrie:
+    """A trie of string keys, each with a value, that can resolve any
+    prefix of its keys which only leads to one value. Every node keeps
+    the set of values below it, so a lookup is a single walk down the
+    prefix.
+    """
+    def __init__(self, items=()):
+        self._root = ({}, set())
+        for key, value in items:
+            self.insert(key, value)
+
+    def insert(self, key, value):
+        """Add a key with the given value."""
+        children, values = self._root
+        values.add(value)
+        for char in key:
+            children, values = children.setdefault(char, ({}, set()))
+            values.add(value)
+
+    def unique(self, prefix):
+        """Return the one value whose keys start with prefix, or None if
+        there are none or several.
+        """
+        children, values = self._root
+        for char in prefix:
+            try:
+                children, values = children[char]
+            except KeyError:
+                return None
+        if len(values) == 1:
+            value, = values
+            return value
+        return None
+
+
+def source_hash(module):
+    """Return a hash of the source of one of the solver modules, and of
+    ktane.py which works out the bomb facts it uses, to tell whether a
+    compiled table is out of date.
+    """
+    import hashlib  # pylint: disable=import-outside-toplevel
+    sha = hashlib.sha256()
+    for name in (module, "ktane"):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.py")
+        with open(path, "rb") as source:
+            sha.update(source.read())
+    return sha.hexdigest()
+
+
+def load_table(module):
+    """Return the table compile_tables.py compiled for a module, or None
+    if there isn't one, it can't be read, or its rules have changed since
+    it was compiled. Tables are only read from disk the first time they're
+    asked for.
+    """
+    if not USE_TABLES:
+        return None
+    if module not in _TABLES:
+        table = None
+        try:
+            with open(os.path.join(COMPILED_DIR, f"{module}.json"), encoding="utf-8") as compiled:
+                data = json.load(compiled)
+            if data["source"] == source_hash(module):
+                table = data["table"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError):
+            pass  # A truncated or edited table, so use the rules instead
+        _TABLES[module] = table
+    return _TABLES[module]
@@ -26,6 +26,13 @@ def no_cut():
     print(f"\nDo {bold('NOT')} cut the wire")
 
 
+def should_cut(colour, letter, count):
+    """Return True if a wire of the given colour and terminus should be
+    cut, given the number of wires of that colour already seen.
+    """
+    return letter in CUT_MATRIX[colour][count]
+
+
 def is_valid_wire_sequence(wire):
     """Verifies the provided wire sequence consists of valid
     characters.
@@ -35,50 +42,146 @@ def is_valid_wire_sequence(wire):
     return False
 
 
+def parse_panels(string):
+    """Split a string of wires, with spaces removed, into panels, e.g.
+    "RABC,KA" into [["RA", "BC"], ["KA"]]. Panels are separated by
+    commas or slashes. Raises ValueError if any wire isn't valid.
+    """
+    panels = []
+    for panel in string.replace("/", ",").split(","):
+        wires = [panel[i:i + 2] for i in range(0, len(panel), 2)]
+        if not wires or not all(is_valid_wire_sequence(wire) for wire in wires):
+            raise ValueError(f"Invalid panel: {panel}")
+        panels.append(wires)
+    return panels
+
+
+class SequenceState:
+    """The wires of each colour seen so far in a Wire Sequence module,
+    updated a panel at a time. The counts before each panel are
+    checkpointed, so undoing any number of panels is a single lookup.
+    """
+    MAX_PANEL_WIRES = 3
+    _COLOUR_INDEX = {"R": 0, "B": 1, "K": 2}
+
+    def __init__(self):
+        self.counts = (0, 0, 0)  # Red, blue, black
+        self.panels = 0
+        # The counts before each panel, which may run past self.panels
+        # after an undo, until they're overwritten
+        self._checkpoints = []
+
+    def submit(self, wires):
+        """Return whether to cut each of the wires on a panel, and move
+        on to the next panel. Raises ValueError if there are too many
+        wires, either on the panel or of one colour.
+        """
+        if len(wires) > self.MAX_PANEL_WIRES:
+            raise ValueError(f"A panel has at most {self.MAX_PANEL_WIRES} wires")
+        counts = list(self.counts)
+        cuts = []
+        for colour, letter in wires:
+            index = self._COLOUR_INDEX[colour]
+            try:
+                cuts.append(letter in CUT_MATRIX[colour][counts[index]])
+            except KeyError:
+                raise ValueError(f"Too many wires of colour {colour}") from None
+            counts[index] += 1
+
+        if self.panels < len(self._checkpoints):
+            self._checkpoints[self.panels] = self.counts
+        else:
+            self._checkpoints.append(self.counts)
+        self.counts = tuple(counts)
+        self.panels += 1
+        return cuts
+
+    def submit_panels(self, panels):
+        """Submit several panels in order, returning the cuts for each."""
+        return [self.submit(wires) for wires in panels]
+
+    def undo(self, panels=1):
+        """Roll back the last few panels, raising ValueError if there
+        aren't that many.
+        """
+        if not 0 < panels <= self.panels:
+            raise ValueError(f"Can't undo {panels} panel(s) out of {self.panels}")
+        self.panels -= panels
+        self.counts = self._checkpoints[self.panels]
+
+
 class WireSequence:
     """Class to represent the Wire Sequence module. Solving requires
     inputting the wires in order (ordered by the numbers on the left),
     listing their colour and which letter they terminate at. The wires
     should either be cut or not depending on the colour, their terminus,
     and how many wires of that colour we've seen so far.
+
+    A whole panel of wires can be inputted at once, or several panels
+    separated by commas, and undoing rolls back a panel at a time.
+    Exiting before the last panel, and solving it again, carries on from
+    the same panel.
     """
+    PANELS = 4
+
     def __init__(self):
-        self.wire_counts = {"R": 0, "B": 0, "K": 0}
-        self.sequence = []
+        self.state = SequenceState()
+
+    @property
+    def finished(self):
+        """Whether every panel of the module has been answered."""
+        return self.state.panels >= self.PANELS
 
-    def get_wire(self):
-        """Prompt user to provide a wire colour and terminus."""
+    def get_panels(self):
+        """Prompt user to provide the colour and terminus of the wires on
+        one or more panels.
+        """
         while True:
-            wire = get_input("\nInput the colour of the wire, and the letter to which "
-                             "it is connected. Use 'K' for black.\n"
-                             "(Type 'exit' to exit, 'undo' to undo previous move.) ")
-            if wire == "EXIT":
+            string = get_input("\nInput the colour of each wire on the panel, and the letter "
+                               "to which it is connected, e.g. 'RA KC'. Use 'K' for black, "
+                               "and separate panels with commas.\n"
+                               "(Type 'exit' to exit, 'undo' to undo the previous panel.) ")
+            if string == "EXIT":
                 print("\nExiting\n")
                 return None
 
-            if wire == "UNDO":
-                if not self.sequence:
-                    print("Nothing to undo!")
+            if string.startswith("UNDO"):
+                count = string[len("UNDO"):]
+                try:
+                    self.state.undo(int(count) if count else 1)
+                except ValueError:
+                    print("Nothing to undo!" if not self.state.panels else "Invalid undo")
                 else:
-                    move = self.sequence.pop()
-                    self.wire_counts[move] -= 1
-                    print("Last move undone")
-            elif is_valid_wire_sequence(wire):
-                return wire
-            else:
-                print("Invalid wire")
+                    print("Last move undone" if not count else f"Last {count} panels undone")
+                continue
+            try:
+                return parse_panels(string)
+            except ValueError as err:
+                print(err)
 
     def solve(self):
         """Solve the Wire Sequence module."""
+        if self.state.panels:
+            print(f"Carrying on from panel {self.state.panels + 1}")
         while True:
-            wire = self.get_wire()
-            if wire is None:  # "EXIT"
+            panels = self.get_panels()
+            if panels is None:  # "EXIT"
                 return
-            colour, letter = wire
-            number = self.wire_counts[colour]
-            if letter in CUT_MATRIX[colour][number]:
-                cut()
-            else:
-                no_cut()
-            self.wire_counts[colour] += 1
-            self.sequence.append(colour)
+            for wires in panels:
+                try:
+                    cuts = self.state.submit(wires)
+                except ValueError as err:
+                    print(err)
+                    break
+                if len(panels) == 1 and len(wires) == 1:
+                    if cuts[0]:
+                        cut()
+                    else:
+                        no_cut()
+                    continue
+                print(f"\nPanel {self.state.panels}:")
+                for wire, cut_wire in zip(wires, cuts):
+                    if cut_wire:
+                        print(f"   {wire}: {bold('CUT')} the wire")
+                    else:
+                        print(f"   {wire}: Do {bold('NOT')} cut the wire")
@@ -4,7 +4,7 @@ The Who's On First module consists of a display which shows 0-2 words,
 and 6 buttons underneath, each of which shows 1-2 words.
 """
 
-
+from colours import bold
 from utils import get_input
 
 def get_wof_display():
@@ -19,30 +19,58 @@ def get_wof_display():
         print("Please input a valid display entry")
 
 def get_wof_button(display):
-    """Prompt user for input to get the word on a specific button."""
+    """Prompt user for input to get the word on a specific button, or
+    the words on all six buttons. Returns either the word, or a list of
+    all six words in reading order.
+    """
     while True:
-        button = get_input(f"What word is on the {DISPLAY_DICT[display]} button? ")
-        if button == ("EXIT", "QUIT"):
+        button = get_input(f"What word is on the {DISPLAY_DICT[display]} button? "
+                           "(Or input all six buttons, in reading order, separated "
+                           "by commas) ")
+        if button in ("EXIT", "QUIT"):
             print("Exiting\n")
             return None
         if button in VALID_BUTTONS:
             return button
+        labels = button.split(",")
+        if len(labels) == 6 and all(label in VALID_BUTTONS for label in labels):
+            return labels
         print("Please input a valid button entry")
 
 
+def button_to_press(display, labels):
+    """Return the position (0-5, in reading order) of the button to
+    press, given the display and the six button labels in reading order
+    (with spaces removed).
+    """
+    for word in PRIORITIES[labels[DISPLAY_POSITIONS[display]]]:
+        if word in labels:
+            return labels.index(word)
+    # Every priority list contains its own label, so we never get here
+    raise ValueError(f"No button to press for {display}: {labels}")
+
+
+def buttons_to_press(layouts):
+    """Return the position of the button to press for each (display,
+    labels) pair in an iterable of layouts.
+    """
+    return [button_to_press(display, labels) for display, labels in layouts]
+
+
 class WOF:
     """Class to represent the Who's On First module. Solving requires
     inputting the word(s) on the display. This then prompts for the
     word(s) on a specific button. Based on the latter word(s), the user
     must press the first word in a list of words that appears on one of
-    their buttons.
+    their buttons. If all six buttons are given, the button to press is
+    found directly.
     """
     def __init__(self):
         pass
 
     def solve(self):
-        """Solves the "Who's on first" module, by outputting the list of
-        potential solutions in order.
+        """Solves the "Who's on first" module, by outputting the button
+        to press, or the list of potential solutions in order.
         """
         # We keep going until the user wants to stop
         while True:
@@ -52,9 +80,13 @@ class WOF:
             button = get_wof_button(display)
             if button is None:  # "EXIT" or "QUIT"
                 return
+            if isinstance(button, list):
+                position = button_to_press(display, button)
+                print(f"\nPress the {bold(POSITIONS[position].upper())} button "
+                      f"({button[position]})")
+                continue
             print("\nThe button to press is the first valid entry in the following list: ")
-            for word in BUTTON_DICT[button]:
-                print(word)
+            print("\n".join(BUTTON_DICT[button]))
 
 
 if __name__ == "__main__":
@@ -113,3 +145,13 @@ BUTTON_DICT = \
 'HOLD': ['YOU ARE', 'U', 'DONE', 'UH UH', 'YOU', 'UR', 'SURE', 'WHAT?', "YOU'RE", 'NEXT', 'HOLD', 'UH HUH', 'YOUR', 'LIKE'],
 'SURE': ['YOU ARE', 'DONE', 'LIKE', "YOU'RE", 'YOU', 'HOLD', 'UH HUH', 'UR', 'SURE', 'U', 'WHAT?', 'NEXT', 'YOUR', 'UH UH'],
 'LIKE': ["YOU'RE", 'NEXT', 'U', 'UR', 'HOLD', 'DONE', 'UH UH', 'WHAT?', 'UH HUH', 'YOU', 'LIKE', 'SURE', 'YOU ARE', 'YOUR']}
+
+# Precomputed tables for finding the button to press: the index of the
+# button each display points to, and the priority lists with spaces
+# removed, to match the button labels
+POSITIONS = ('top left', 'top right', 'middle left', 'middle right',
+             'bottom left', 'bottom right')
+DISPLAY_POSITIONS = {display: POSITIONS.index(position)
+                     for display, position in DISPLAY_DICT.items()}
+PRIORITIES = {label: tuple(word.replace(" ", "") for word in priorities)
+              for label, priorities in BUTTON_DICT.items()}